@@ -1,116 +1,169 @@
 import argparse
+import hashlib
 import json
 import os
+import textwrap
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from bs4 import BeautifulSoup
-from thefuzz import process
-
-from form_filler.data_loader import load_data
-
-def get_label_for_element(element, soup):
-    """Tries to find the human-readable label for a form element."""
-    # 1. Check for a <label for="element_id">
-    if element.get('id'):
-        label = soup.find('label', {'for': element['id']})
-        if label:
-            return label.get_text(strip=True)
-
-    # 2. Check if the element is wrapped in a <label>
-    parent_label = element.find_parent('label')
-    if parent_label:
-        return parent_label.get_text(strip=True)
-
-    # 3. Look for a <label> that is an immediate sibling
-    prev_sibling = element.find_previous_sibling()
-    if prev_sibling and prev_sibling.name == 'label':
-        return prev_sibling.get_text(strip=True)
-        
-    return None
-
-def find_submit_button(soup):
-    """Heuristically finds the submit button."""
-    # Look for button or input with type=submit
-    buttons = soup.find_all(['button', 'input'])
-    for button in buttons:
-        if button.get('type') == 'submit':
-            # Prefer ID, then name
-            if button.get('id'):
-                return {"type": "id", "value": button['id']}
-            if button.get('name'):
-                return {"type": "name", "value": button['name']}
-    return {"type": "css_selector", "value": "[type='submit']"} # Fallback
+from typing import Any, Dict, List, Optional, Tuple
+
+from form_filler.data_loader import iter_rows
+from form_filler.field_matching import match_headers
+from form_filler.verification import DEFAULT_SUCCESS_CONDITION
+from form_filler.form_parser import collect_field_signals, find_submit_button, load_form_soup
+
+# Batch mode remembers generated configs here, keyed by form contents, headers and threshold.
+AUTODETECT_CACHE_DIR = '.autodetect_cache'
+# Bumped when the matching changes, so cached configs from older matching are regenerated.
+MATCHING_VERSION = 2
+
+def generate_mapping(form_url: str, data_headers: List[str], threshold: int) -> Tuple[Dict[str, Any], List[str]]:
+    """Builds the mapping config for one form. Returns the config and the log lines describing it."""
+    lines = []
+    soup = load_form_soup(form_url)
+    if soup.find('form') is None:
+        raise ValueError(f"No <form> in {form_url}")
+    field_signals = collect_field_signals(soup)
+    lines.append(f"Detected form fields: {list(field_signals.keys())}")
+
+    # Match all data headers against all form fields at once, one field per header
+    matches = match_headers(data_headers, field_signals, threshold)
+    field_mappings = {}
+    lines.append("\n--- Matching Fields (Threshold > {}%) ---".format(threshold))
+    for header, match in matches.items():
+        if match['field']:
+            field_mappings[header] = match['field']
+            line = f"  ✅ Matched '{header}' (data) -> '{match['text']}' ({match['signal']}) -> '{match['field']}' (field) [Score: {match['score']:g}]"
+            if match['ambiguous']:
+                line += f" ⚠️ ambiguous, runner-up '{match['runner_up']['field']}' [Score: {match['runner_up']['score']:g}]"
+            lines.append(line)
+        elif match['best_guess']:
+            lines.append(f"  ❌ No confident match for '{header}' [Best guess: '{match['text']}' ({match['best_guess']}), Score: {match['score']:g}]")
+        else:
+            lines.append(f"  ❌ No confident match for '{header}' [The form has no fields]")
+
+    # Assemble the final config object
+    config = {
+        "form_url": os.path.relpath(form_url),
+        "field_mappings": field_mappings,
+        "submit_button": find_submit_button(soup),
+        "success_condition": dict(DEFAULT_SUCCESS_CONDITION),
+        # Why each header was (or was not) mapped; the form filler ignores it.
+        "match_report": matches
+    }
+    return config, lines
+
+def save_config(config: Dict[str, Any], output_file: str):
+    Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w') as f:
+        json.dump(config, f, indent=2)
+
+def _cache_key(form_path: Path, data_headers: List[str], threshold: int) -> str:
+    digest = hashlib.sha256(form_path.read_bytes())
+    digest.update(json.dumps([MATCHING_VERSION, data_headers, threshold, os.path.relpath(form_path)]).encode('utf-8'))
+    return digest.hexdigest()
+
+def _autodetect_one(form_url: str, output_file: str, data_headers: List[str], threshold: int,
+                    cache_dir: Optional[str], force: bool = False) -> Tuple[str, str, List[str]]:
+    """
+    Batch worker: generates one form's config unless the cache shows it is
+    unchanged. An existing config is only overwritten with force, as it may
+    have been written or edited by hand.
+    """
+    cache_file = None
+    if cache_dir:
+        cache_file = Path(cache_dir) / f"{_cache_key(Path(form_url), data_headers, threshold)}.json"
+        if cache_file.exists():
+            if Path(output_file).exists():
+                return form_url, 'unchanged', []
+            with open(cache_file, 'r') as f:
+                save_config(json.load(f), output_file)
+            return form_url, 'restored from cache', []
+    if Path(output_file).exists() and not force:
+        return form_url, f"kept the existing {output_file} (use --force to regenerate it)", []
+
+    try:
+        config, lines = generate_mapping(form_url, data_headers, threshold)
+    except ValueError as e:
+        return form_url, f"skipped: {e}", []
+    except Exception as e:
+        return form_url, f"failed: {e}", []
+    save_config(config, output_file)
+    if cache_file:
+        save_config(config, str(cache_file))
+    return form_url, f"{len(config['field_mappings'])} fields mapped", lines
+
+def run_batch(form_dir: str, output_dir: str, data_headers: List[str], threshold: int,
+              jobs: Optional[int], cache_dir: Optional[str], force: bool = False):
+    """Generates a config for every .html form in a directory, in parallel processes."""
+    forms = sorted(Path(form_dir).glob('*.html'))
+    print(f"Found {len(forms)} forms in {form_dir}")
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(
+                _autodetect_one, str(form), str(Path(output_dir) / f"{form.stem}_mapping.json"),
+                data_headers, threshold, cache_dir, force
+            )
+            for form in forms
+        ]
+        for future in futures:
+            form_url, status, lines = future.result()
+            print(f"  {form_url}: {status}")
+            # The match log, including matches flagged as ambiguous.
+            for line in lines:
+                print(textwrap.indent(line, '    '))
 
 def main():
     parser = argparse.ArgumentParser(description="Auto-detect form fields and generate a mapping config.")
-    parser.add_argument("--form-url", required=True, help="Path to the local HTML form file.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--form-url", help="Path to the local HTML form file.")
+    source.add_argument("--form-dir", help="Directory of HTML forms to generate one mapping config each for.")
     parser.add_argument("--data-file", required=True, help="Path to the data file (CSV, JSON, XLSX) to get headers.")
-    parser.add_argument("--output-file", required=True, help="Path to save the generated JSON mapping config.")
+    parser.add_argument("--output-file", help="Path to save the generated JSON mapping config (with --form-url).")
+    parser.add_argument("--output-dir", default="config/generated", help="Directory for the generated configs (with --form-dir).")
+    parser.add_argument("--force", action="store_true", help="Overwrite configs that already exist in --output-dir.")
     parser.add_argument("--threshold", type=int, default=75, help="Fuzzy matching score threshold (0-100).")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes for --form-dir (default: one per CPU).")
+    parser.add_argument("--cache-dir", default=AUTODETECT_CACHE_DIR, help="Cache so unchanged forms are skipped in --form-dir mode.")
+    parser.add_argument("--no-cache", action="store_true", help="Regenerate every config in --form-dir mode.")
     args = parser.parse_args()
 
+    if args.form_url and not args.output_file:
+        parser.error("--output-file is required with --form-url")
+
     print("--- Starting Field Auto-Detection ---")
 
     # 1. Load data to get headers
     try:
-        data_rows = load_data(args.data_file)
-        if not data_rows:
+        # Only the headers are needed, so read just the first row.
+        first_row = next(iter(iter_rows(args.data_file)), None)
+        if first_row is None:
             print("Error: Data file is empty.")
             return
-        data_headers = list(data_rows[0].keys())
+        data_headers = list(first_row.keys())
         print(f"Detected data headers: {data_headers}")
     except Exception as e:
         print(f"Error loading data file: {e}")
         return
 
-    # 2. Parse HTML form to find fields
-    form_path = Path(args.form_url)
-    if not form_path.exists():
-        print(f"Error: Form file not found at {args.form_url}")
+    if args.form_dir:
+        run_batch(args.form_dir, args.output_dir, data_headers, args.threshold, args.jobs,
+                  None if args.no_cache else args.cache_dir, args.force)
         return
-    
-    with open(form_path, 'r', encoding='utf-8') as f:
-        soup = BeautifulSoup(f, 'html.parser')
-
-    form_fields = {}
-    form_elements = soup.find_all(['input', 'select', 'textarea'])
-    
-    for element in form_elements:
-        name = element.get('name')
-        elem_type = element.get('type')
-        if name and elem_type not in ['submit', 'button', 'reset']:
-            label = get_label_for_element(element, soup)
-            if label:
-                # Store the name and its best-guess label
-                form_fields[label] = name
-    
-    print(f"Detected form fields: {list(form_fields.keys())}")
-
-    # 3. Match data headers to form field labels
-    field_mappings = {}
-    print("\n--- Matching Fields (Threshold > {}%) ---".format(args.threshold))
-    for header in data_headers:
-        # Find the best match from the available form labels
-        best_match, score = process.extractOne(header, form_fields.keys())
-        
-        if score >= args.threshold:
-            form_field_name = form_fields[best_match]
-            field_mappings[header] = form_field_name
-            print(f"  ✅ Matched '{header}' (data) -> '{best_match}' (label) -> '{form_field_name}' (field) [Score: {score}]")
-        else:
-            print(f"  ❌ No confident match for '{header}' [Best guess: '{best_match}', Score: {score}]")
 
-    # 4. Assemble the final config object
-    config = {
-        "form_url": os.path.relpath(args.form_url),
-        "field_mappings": field_mappings,
-        "submit_button": find_submit_button(soup)
-    }
+    # 2. Parse the HTML form and match its fields
+    try:
+        config, lines = generate_mapping(args.form_url, data_headers, args.threshold)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}")
+        return
+    for line in lines:
+        print(line)
 
-    # 5. Save the config to a file
-    with open(args.output_file, 'w') as f:
-        json.dump(config, f, indent=2)
+    # 3. Save the config to a file
+    save_config(config, args.output_file)
 
     print(f"\n✅ Successfully generated mapping config at: {args.output_file}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import functools
+import random
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Tuple
+
+# The project root, so form paths like 'forms/form1.html' from the mapping configs work as URLs.
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+class FormRequestHandler(SimpleHTTPRequestHandler):
+    """Serves the project files with an artificial delay and a random failure rate."""
+    latency = 0.0
+    failure_rate = 0.0
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean.
+
+    def _should_fail(self) -> bool:
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failure_rate and random.random() < self.failure_rate:
+            self.send_error(503, "Injected failure")
+            return True
+        return False
+
+    def do_GET(self):
+        if not self._should_fail():
+            super().do_GET()
+
+    def do_POST(self):
+        # Read the form body so the connection can be reused, then answer like a GET.
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        if not self._should_fail():
+            super().do_GET()
+
+
+def start_server(port: int = 0, latency: float = 0.0, failure_rate: float = 0.0,
+                 directory: Path = PROJECT_ROOT) -> Tuple[ThreadingHTTPServer, str]:
+    """Starts the server on a background thread. Returns the server and its base URL."""
+    handler = type('ConfiguredFormRequestHandler', (FormRequestHandler,), {
+        'latency': latency,
+        'failure_rate': failure_rate,
+    })
+    server = ThreadingHTTPServer(('127.0.0.1', port), functools.partial(handler, directory=str(directory)))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the forms/ directory for benchmarks and HTTP engine testing.")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before answering each request.")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests (0-1) answered with HTTP 503.")
+    args = parser.parse_args()
+
+    server, base_url = start_server(args.port, args.latency, args.failure_rate)
+    print(f"Serving {PROJECT_ROOT} at {base_url} (latency {args.latency}s, failure rate {args.failure_rate:.0%})")
+    print(f"Form 1: {base_url}forms/form1.html  -- press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import csv
+import json
+import random
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+FIRST_NAMES = ['Alice', 'Bob', 'Charlie', 'Diana', 'Ethan', 'Fatima', 'George', 'Hana', 'Ivan', 'Julia', 'Kiran', 'Lena']
+LAST_NAMES = ['Johnson', 'Williams', 'Brown', 'Garcia', 'Nguyen', 'Patel', 'Smith', 'Kowalski', 'Okafor', 'Rossi']
+EXPERIENCE = ['Beginner', 'Intermediate', 'Advanced']
+DIETS = ['None', 'Vegetarian', 'Vegan', 'Gluten-Free']
+FIELDS = ['full_name', 'email', 'age', 'experience', 'diet']
+
+FORMATS = ['csv', 'json', 'jsonl', 'xlsx']
+
+
+def generate_rows(count: int, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """Yields synthetic attendee rows shaped like data/attendees.csv. The same seed gives the same rows."""
+    rng = random.Random(seed)
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield {
+            'full_name': f"{first} {last}",
+            # The row number keeps every email (and so every row) unique.
+            'email': f"{first.lower()}.{last.lower()}{i}@example.com",
+            'age': rng.randint(18, 75),
+            'experience': rng.choice(EXPERIENCE),
+            'diet': rng.choice(DIETS),
+        }
+
+
+def write_dataset(path: str, count: int, seed: int = 42) -> Path:
+    """Writes `count` rows to `path`; the format comes from the extension. Rows are streamed, never held in memory."""
+    out = Path(path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    fmt = out.suffix.lower().lstrip('.')
+    rows = generate_rows(count, seed)
+
+    if fmt == 'csv':
+        with open(out, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    elif fmt == 'json':
+        with open(out, 'w', encoding='utf-8') as f:
+            f.write('[\n')
+            for i, row in enumerate(rows):
+                f.write((',\n' if i else '') + json.dumps(row))
+            f.write('\n]\n')
+    elif fmt == 'jsonl':
+        with open(out, 'w', encoding='utf-8') as f:
+            for row in rows:
+                f.write(json.dumps(row) + '\n')
+    elif fmt == 'xlsx':
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(FIELDS)
+        for row in rows:
+            sheet.append([row[field] for field in FIELDS])
+        workbook.save(out)
+    else:
+        raise ValueError(f"Unsupported format '{fmt}'. Expected one of: {', '.join(FORMATS)}")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic attendee data for benchmarks.")
+    parser.add_argument("--rows", type=int, default=10000, help="Number of rows to generate (10 to 1,000,000).")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=['csv', 'json', 'xlsx'], help="File formats to write.")
+    parser.add_argument("--output-dir", default="benchmarks/data", help="Directory to write the files to.")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed, for reproducible data.")
+    args = parser.parse_args()
+
+    for fmt in args.formats:
+        path = write_dataset(Path(args.output_dir) / f"attendees_{args.rows}.{fmt}", args.rows, args.seed)
+        print(f"Wrote {args.rows} rows to {path} ({path.stat().st_size / 1_000_000:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import runpy
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.generate_data import write_dataset
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SCENARIOS = ['load', 'autodetect', 'fill']
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of the current process, where the platform can tell us."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _latency_stats(latencies: List[float]) -> Dict[str, float]:
+    from form_filler.metrics import percentile
+
+    values = sorted(latencies)
+    return {
+        'latency_p50': percentile(values, 0.50),
+        'latency_p95': percentile(values, 0.95),
+        'latency_p99': percentile(values, 0.99),
+    }
+
+
+def scenario_load(params: Dict[str, Any], entered: float) -> Dict[str, Any]:
+    """Streams a whole data file through iter_rows."""
+    from form_filler.data_loader import iter_rows
+
+    started = time.monotonic()
+    first_row_at = None
+    count = 0
+    for _ in iter_rows(params['data_file']):
+        if first_row_at is None:
+            first_row_at = time.monotonic()
+        count += 1
+    seconds = time.monotonic() - started
+    return {
+        'rows': count,
+        'seconds': round(seconds, 4),
+        'rows_per_second': round(count / seconds, 2) if seconds else None,
+        'startup_seconds': round((first_row_at or time.monotonic()) - entered, 4),
+    }
+
+
+def scenario_autodetect(params: Dict[str, Any], entered: float) -> Dict[str, Any]:
+    """Runs autodetect_fields.py end to end against every form in forms/."""
+    forms = sorted(str(path) for path in (PROJECT_ROOT / 'forms').glob('*.html') if path.stem != 'success')
+    latencies = []
+    first_done_at = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for _ in range(params['repeat']):
+            for form in forms:
+                output = str(Path(tmp) / 'mapping.json')
+                argv = sys.argv
+                sys.argv = ['autodetect_fields.py', '--form-url', form, '--data-file', params['data_file'], '--output-file', output]
+                started = time.monotonic()
+                try:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        runpy.run_path(str(PROJECT_ROOT / 'autodetect_fields.py'), run_name='__main__')
+                finally:
+                    sys.argv = argv
+                latencies.append(time.monotonic() - started)
+                first_done_at = first_done_at or time.monotonic()
+    seconds = sum(latencies)
+    return {
+        'forms': len(latencies),
+        'seconds': round(seconds, 4),
+        'forms_per_second': round(len(latencies) / seconds, 2) if seconds else None,
+        'startup_seconds': round(first_done_at - entered, 4) if first_done_at else None,
+        **_latency_stats(latencies),
+    }
+
+
+def scenario_fill(params: Dict[str, Any], entered: float) -> Dict[str, Any]:
+    """Fills generated rows against the local form server with a FillerPool."""
+    from benchmarks.form_server import start_server
+    from benchmarks.generate_data import generate_rows
+    from form_filler.config_handler import load_mapping_config
+    from form_filler.pool import FillerPool
+    from form_filler.rate_limit import RateLimiter
+
+    config = load_mapping_config(str(PROJECT_ROOT / params['config_file']))
+    server, base_url = start_server(latency=params['latency'], failure_rate=params['failure_rate'])
+    try:
+        if params['engine'] == 'http':
+            from form_filler.http_filler import HttpFormFiller, make_http_pool
+
+            http = make_http_pool(params['workers'])
+            make_filler = lambda: HttpFormFiller(config, base_url, http=http)
+        else:
+            from form_filler.filler import FormFiller
+
+            make_filler = lambda: FormFiller(
+                config, headless=True, fill_mode=params['fill_mode'],
+                page_reuse=params.get('reuse_page', False), block_resources=params.get('block_resources'),
+            )
+
+        pool = FillerPool(make_filler, workers=params['workers'], log=lambda message: None, rate_limiter=RateLimiter())
+        started = time.monotonic()
+        first_result_at = None
+        latencies = []
+        successes = 0
+        for _, result in pool.run(generate_rows(params['rows'])):
+            first_result_at = first_result_at or time.monotonic()
+            latencies.append(result.get('latency') or 0.0)
+            successes += result['status'] == 'SUCCESS'
+        seconds = time.monotonic() - started
+    finally:
+        server.shutdown()
+
+    return {
+        'rows': len(latencies),
+        'successes': successes,
+        'seconds': round(seconds, 4),
+        'rows_per_second': round(len(latencies) / seconds, 2) if seconds else None,
+        'startup_seconds': round(first_result_at - entered, 4) if first_result_at else None,
+        **_latency_stats(latencies),
+    }
+
+
+def _child(name: str, params: Dict[str, Any], results):
+    """Runs one scenario in a fresh interpreter so its startup time and peak memory are its own."""
+    entered = time.monotonic()
+    # Mapping configs use paths relative to the project root.
+    os.chdir(PROJECT_ROOT)
+    sys.path.insert(0, str(PROJECT_ROOT))
+    try:
+        metrics = globals()[f"scenario_{name}"](params, entered)
+        metrics['peak_rss_mb'] = _peak_rss_mb()
+        results.put({'ok': True, 'metrics': metrics})
+    except Exception as e:
+        results.put({'ok': False, 'error': f"{e.__class__.__name__}: {e}"})
+
+
+def run_scenario(name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    started = time.monotonic()
+    process = context.Process(target=_child, args=(name, params, results))
+    process.start()
+    while True:
+        try:
+            outcome = results.get(timeout=1)
+            break
+        except queue.Empty:
+            if not process.is_alive():
+                outcome = {'ok': False, 'error': f"Scenario process exited with code {process.exitcode}"}
+                break
+    process.join()
+    outcome['metrics'] = {**outcome.get('metrics', {}), 'process_seconds': round(time.monotonic() - started, 4)}
+    return {'scenario': name, 'params': params, **outcome}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _scenario_key(record: Dict[str, Any]) -> str:
+    params = {k: v for k, v in record['params'].items() if k not in ['data_file']}
+    return f"{record['scenario']} {json.dumps(params, sort_keys=True)}"
+
+
+def compare(current: Dict[str, Any], baseline_file: str):
+    """Prints how throughput moved against an earlier results file."""
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        baseline = {_scenario_key(r): r for r in json.load(f)['results'] if r.get('ok')}
+    print(f"\n--- Compared with {baseline_file} ---")
+    for record in current['results']:
+        before = baseline.get(_scenario_key(record))
+        if not record.get('ok') or not before:
+            continue
+        throughput = 'forms_per_second' if record['scenario'] == 'autodetect' else 'rows_per_second'
+        new, old = record['metrics'].get(throughput), before['metrics'].get(throughput)
+        if new and old:
+            print(f"  {_scenario_key(record)}: {old:.1f} -> {new:.1f} per second ({(new - old) / old:+.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the form filler benchmark scenarios.")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS, help="Scenarios to run.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000], help="Data sizes for the load scenario.")
+    parser.add_argument("--formats", nargs="+", default=['csv', 'json', 'xlsx'], help="Data formats for the load scenario.")
+    parser.add_argument("--data-dir", default="benchmarks/data", help="Where generated data files are cached.")
+    parser.add_argument("--autodetect-repeat", type=int, default=5, help="How many times autodetect runs per form.")
+    parser.add_argument("--fill-rows", type=int, default=500, help="Rows submitted in the fill scenario.")
+    parser.add_argument("--fill-engine", choices=['http', 'browser'], default='http', help="Engine for the fill scenario.")
+    parser.add_argument("--fill-mode", choices=['element', 'bulk'], default='element', help="Fill mode for the browser engine.")
+    parser.add_argument("--reuse-page", action="store_true", help="Reset the loaded form between rows (browser engine).")
+    parser.add_argument("--block-resources", nargs="*", help="Resource kinds the browser should not load (browser engine).")
+    parser.add_argument("--workers", type=int, default=4, help="Workers in the fill scenario.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Artificial server latency in seconds.")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of server requests that fail.")
+    parser.add_argument("--config-file", default="config/form1_mapping.json", help="Mapping config for the fill scenario.")
+    parser.add_argument("--output-dir", default="benchmarks/results", help="Where the results JSON is written.")
+    parser.add_argument("--baseline", help="Earlier results file to compare throughput against.")
+    args = parser.parse_args()
+
+    def data_file(rows: int, fmt: str) -> str:
+        path = Path(args.data_dir) / f"attendees_{rows}.{fmt}"
+        if not path.exists():
+            print(f"Generating {path}...")
+            write_dataset(path, rows)
+        return str(path.resolve())
+
+    plan = []
+    if 'load' in args.scenarios:
+        for rows in args.rows:
+            for fmt in args.formats:
+                plan.append(('load', {'data_file': data_file(rows, fmt), 'rows': rows, 'format': fmt}))
+    if 'autodetect' in args.scenarios:
+        plan.append(('autodetect', {'data_file': data_file(min(args.rows), 'csv'), 'repeat': args.autodetect_repeat}))
+    if 'fill' in args.scenarios:
+        params = {
+            'rows': args.fill_rows, 'engine': args.fill_engine, 'fill_mode': args.fill_mode, 'workers': args.workers,
+            'latency': args.latency, 'failure_rate': args.failure_rate, 'config_file': args.config_file,
+        }
+        if args.fill_engine == 'browser':
+            # Only browser runs have these, so HTTP results stay comparable with older baselines.
+            params.update({'reuse_page': args.reuse_page, 'block_resources': args.block_resources})
+        plan.append(('fill', params))
+
+    results = []
+    for name, params in plan:
+        print(f"Running {name} {', '.join(f'{k}={v}' for k, v in params.items() if k != 'data_file')}...")
+        record = run_scenario(name, params)
+        if record['ok']:
+            summary = ', '.join(f"{k}={v}" for k, v in record['metrics'].items())
+            print(f"  {summary}")
+        else:
+            print(f"  FAILED: {record['error']}")
+        results.append(record)
+
+    output = {
+        'timestamp': datetime.now().isoformat(),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': multiprocessing.cpu_count(),
+        'results': results,
+    }
+    out_dir = Path(args.output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_file = out_dir / f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out_file, 'w', encoding='utf-8') as f:
+        json.dump(output, f, indent=2)
+    print(f"\nResults saved to: {out_file}")
+
+    if args.baseline:
+        compare(output, args.baseline)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import argparse
+
+from form_filler.daemon import DEFAULT_DAEMON_ADDRESS, FillerDaemon, daemon_status, parse_address
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep browsers warm between runs, for main.py --daemon.")
+    parser.add_argument("--address", default=DEFAULT_DAEMON_ADDRESS, help="HOST:PORT the daemon listens on.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_cmd = commands.add_parser("serve", help="Launch the browsers and wait for jobs until Ctrl+C.")
+    serve_cmd.add_argument("--browsers", type=int, default=2, help="Number of browsers to keep ready.")
+    serve_cmd.add_argument("--headless", action="store_true", help="Run the browsers in headless mode (no GUI).")
+
+    commands.add_parser("status", help="Show the pool health and job queue of a running daemon.")
+    args = parser.parse_args()
+
+    address = parse_address(args.address)
+    if args.command == "status":
+        try:
+            status = daemon_status(address)
+        except ConnectionError as e:
+            print(f"Error: {e}")
+            return
+        for key, value in status.items():
+            print(f"{key}: {value}")
+        return
+
+    daemon = FillerDaemon(address, browsers=args.browsers, headless=args.headless)
+    try:
+        print(f"Launching {args.browsers} browser(s)...")
+        daemon.browsers.start()
+        print(f"Filler daemon ready on {args.address}. Attach with: python main.py --daemon {args.address} ...")
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down.")
+    finally:
+        daemon.server_close()
+
+if __name__ == "__main__":
+    main()
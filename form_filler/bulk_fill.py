@@ -0,0 +1,88 @@
+from typing import Any, Dict
+
+# Fills a whole row inside the page in one round trip.
+# arguments[0] is {field_name: {"value": str, "truthy": bool}}.
+# Returns {field_name: {"ok": bool, "reason": str, "fallback": bool}}; "fallback" marks
+# fields the script could not handle and that should go through real keystrokes instead.
+BULK_FILL_SCRIPT = """
+var fields = arguments[0];
+var results = {};
+
+function fire(el) {
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+}
+
+function setValue(el, value) {
+    // Use the native setter so frameworks that wrap .value still see the change.
+    var proto = Object.getPrototypeOf(el);
+    var descriptor = Object.getOwnPropertyDescriptor(proto, 'value');
+    if (descriptor && descriptor.set) {
+        descriptor.set.call(el, value);
+    } else {
+        el.value = value;
+    }
+}
+
+for (var name in fields) {
+    var field = fields[name];
+    var elements = document.getElementsByName(name);
+    if (!elements.length) {
+        results[name] = {ok: false, reason: "Could not find element with name='" + name + "'", fallback: false};
+        continue;
+    }
+    var el = elements[0];
+    var tag = el.tagName.toLowerCase();
+    var type = (el.getAttribute('type') || '').toLowerCase();
+    try {
+        if (tag === 'select') {
+            var found = false;
+            for (var i = 0; i < el.options.length; i++) {
+                if (el.options[i].value === field.value) {
+                    el.selectedIndex = i;
+                    found = true;
+                    break;
+                }
+            }
+            if (!found) {
+                results[name] = {ok: false, reason: "No option with value '" + field.value + "' in '" + name + "'", fallback: false};
+                continue;
+            }
+            fire(el);
+        } else if (type === 'radio') {
+            var radio = null;
+            for (var j = 0; j < elements.length; j++) {
+                if (elements[j].value === field.value) {
+                    radio = elements[j];
+                    break;
+                }
+            }
+            if (!radio) {
+                results[name] = {ok: false, reason: "No radio option with value '" + field.value + "' in '" + name + "'", fallback: false};
+                continue;
+            }
+            radio.checked = true;
+            fire(radio);
+        } else if (type === 'checkbox') {
+            el.checked = field.truthy;
+            fire(el);
+        } else if (tag === 'input' || tag === 'textarea') {
+            setValue(el, field.value);
+            fire(el);
+        } else {
+            results[name] = {ok: false, reason: "Unsupported element type", fallback: true};
+            continue;
+        }
+        results[name] = {ok: true, reason: "", fallback: false};
+    } catch (e) {
+        results[name] = {ok: false, reason: String(e), fallback: true};
+    }
+}
+return results;
+"""
+
+
+def to_script_value(value: Any) -> Dict[str, Any]:
+    """Encodes a row value the way the bulk fill script expects it."""
+    # Python decides truthiness so checkboxes behave exactly like the per-element path.
+    return {'value': str(value), 'truthy': bool(value)}
@@ -0,0 +1,331 @@
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from selenium.common.exceptions import WebDriverException
+
+from form_filler.data_loader import CheckedRow
+from form_filler.filler import FILL_MODES, FormFiller, create_driver, driver_alive
+
+DEFAULT_DAEMON_ADDRESS = '127.0.0.1:8766'
+
+
+def parse_address(text: str) -> Tuple[str, int]:
+    """Parses 'host:port' (or just 'port') into a socket address."""
+    host, _, port = text.rpartition(':')
+    try:
+        return host or '127.0.0.1', int(port)
+    except ValueError:
+        raise ValueError(f"Invalid daemon address '{text}'. Expected HOST:PORT, e.g. {DEFAULT_DAEMON_ADDRESS}")
+
+
+def _send(stream, message: Dict[str, Any]):
+    # One JSON object per line; values JSON has no type for (dates, etc.) are sent as text.
+    stream.write(json.dumps(message, default=str).encode('utf-8') + b'\n')
+    stream.flush()
+
+
+class BrowserPool:
+    """
+    Browsers launched ahead of time and lent out one job at a time. Returned
+    browsers are reset rather than relaunched; dead ones are replaced.
+    """
+    def __init__(self, size: int, headless: bool = True, launch: Callable[[bool], Any] = create_driver):
+        if size < 1:
+            raise ValueError(f"Number of browsers must be at least 1, got {size}.")
+        self.size = size
+        self.headless = headless
+        self._launch = launch
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self.busy = 0
+        self.waiting = 0
+        self.launched = 0
+        self.relaunched = 0
+
+    def start(self):
+        """Launches every browser, in parallel. Raises if none of them could be started."""
+        errors = []
+
+        def launch():
+            try:
+                self._idle.put(self._new_driver())
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=launch, daemon=True) for _ in range(self.size)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if len(errors) == self.size:
+            raise errors[0]
+
+    def _new_driver(self):
+        driver = self._launch(self.headless)
+        with self._lock:
+            self.launched += 1
+        return driver
+
+    def relaunch(self):
+        """Launches a browser to replace one that crashed or was recycled, and counts it."""
+        replacement = self._new_driver()
+        with self._lock:
+            self.relaunched += 1
+        return replacement
+
+    def _replace(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        return self.relaunch()
+
+    def lease(self):
+        """Waits for an idle browser and hands it out."""
+        with self._lock:
+            self.waiting += 1
+        try:
+            driver = self._idle.get()
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        try:
+            if not driver_alive(driver):
+                driver = self._replace(driver)
+        except Exception:
+            # No browser could be relaunched; give the slot back so the pool does not shrink for good.
+            self._idle.put(driver)
+            raise
+        with self._lock:
+            self.busy += 1
+        return driver
+
+    def release(self, driver):
+        """Takes a browser back after a job, clearing what the job left behind."""
+        try:
+            # The job may have told the browser to block resources; the next one starts clean.
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': []})
+        except WebDriverException:
+            pass  # A dead browser is caught just below.
+        try:
+            driver.delete_all_cookies()
+            driver.get('about:blank')
+        except WebDriverException:
+            try:
+                driver = self._replace(driver)
+            except Exception:
+                pass  # Replaced on its next lease instead.
+        with self._lock:
+            self.busy -= 1
+        self._idle.put(driver)
+
+    def health(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'browsers': self.size,
+                'idle': self._idle.qsize(),
+                'busy': self.busy,
+                'jobs_waiting': self.waiting,
+                'launched': self.launched,
+                'relaunched': self.relaunched,
+            }
+
+    def close(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    """
+    One client connection. A job starts with {"op": "start", "config": ...},
+    which leases a browser for the rest of the connection, followed by one
+    {"op": "fill", "row": ...} per row. {"op": "status"} may be sent at any time.
+    """
+    def handle(self):
+        daemon = self.server
+        driver = None
+        filler = None
+        try:
+            for line in self.rfile:
+                message = json.loads(line)
+                op = message.get('op')
+                if op == 'status':
+                    _send(self.wfile, {'ok': True, 'status': daemon.status()})
+                elif op == 'start' and driver is None:
+                    try:
+                        driver = daemon.browsers.lease()
+                        # Browsers the filler relaunches come from the pool, so they are started
+                        # like the others (e.g. headless) and counted in its status.
+                        filler = FormFiller(
+                            message['config'], headless=daemon.browsers.headless,
+                            fill_mode=message.get('fill_mode', 'element'), driver=driver,
+                            recycle_after=message.get('recycle_after'), max_memory_mb=message.get('max_memory_mb'),
+                            max_retries=message.get('max_retries', 2), retry_backoff=message.get('retry_backoff', 1.0),
+                            page_reuse=message.get('page_reuse', False), block_resources=message.get('block_resources'),
+                            launch=lambda headless: daemon.browsers.relaunch()
+                        )
+                    except Exception as e:
+                        _send(self.wfile, {'ok': False, 'error': f"Could not start the job: {e}"})
+                        break
+                    daemon.job_started()
+                    _send(self.wfile, {'ok': True})
+                elif op == 'fill' and filler is not None:
+                    row = message['row']
+                    if message.get('fill_values') is not None:
+                        fill_values = {key: tuple(value) for key, value in message['fill_values'].items()}
+                        row = CheckedRow(row, fill_values)
+                    try:
+                        result = filler.fill_form_for_row(row)
+                    except Exception as e:
+                        _send(self.wfile, {'ok': False, 'error': f"The daemon crashed on this row: {e}"})
+                        continue
+                    # The client already has the row.
+                    result.pop('data', None)
+                    daemon.row_filled()
+                    _send(self.wfile, {'ok': True, 'result': result})
+                elif op == 'finish':
+                    break
+                else:
+                    _send(self.wfile, {'ok': False, 'error': f"Unexpected message '{op}'."})
+        except (ConnectionError, ValueError):
+            pass  # The client went away or sent garbage; just give the browser back.
+        finally:
+            if driver is not None:
+                if filler is not None:
+                    daemon.job_finished()
+                    if filler.driver is not None and filler.driver is not driver:
+                        # The filler relaunched a crashed browser: the leased one is dead and the
+                        # filler's replacement takes its place in the pool. If the relaunch failed,
+                        # the dead one goes back and the pool replaces it.
+                        try:
+                            driver.quit()
+                        except Exception:
+                            pass
+                        driver = filler.driver
+                daemon.browsers.release(driver)
+
+
+class FillerDaemon(socketserver.ThreadingTCPServer):
+    """
+    Keeps a pool of warm browsers and fills rows for clients over a local
+    socket, so a run pays for Chrome's startup once instead of every time.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[str, int], browsers: int = 2, headless: bool = True):
+        self.browsers = BrowserPool(browsers, headless)
+        self.started = time.monotonic()
+        self.active_jobs = 0
+        self.jobs_served = 0
+        self.rows_filled = 0
+        self._counter_lock = threading.Lock()
+        super().__init__(address, _JobHandler)
+
+    def job_started(self):
+        with self._counter_lock:
+            self.active_jobs += 1
+
+    def job_finished(self):
+        with self._counter_lock:
+            self.active_jobs -= 1
+            self.jobs_served += 1
+
+    def row_filled(self):
+        with self._counter_lock:
+            self.rows_filled += 1
+
+    def status(self) -> Dict[str, Any]:
+        with self._counter_lock:
+            counters = {
+                'uptime_seconds': round(time.monotonic() - self.started, 1),
+                'active_jobs': self.active_jobs,
+                'jobs_served': self.jobs_served,
+                'rows_filled': self.rows_filled,
+            }
+        return {**counters, **self.browsers.health()}
+
+    def server_close(self):
+        super().server_close()
+        self.browsers.close()
+
+
+def _connect(address: Tuple[str, int]) -> socket.socket:
+    try:
+        return socket.create_connection(address)
+    except OSError as e:
+        raise ConnectionError(
+            f"No filler daemon at {address[0]}:{address[1]} ({e}). Start one with: python filler_daemon.py serve"
+        )
+
+
+def daemon_status(address: Tuple[str, int]) -> Dict[str, Any]:
+    """Asks a running daemon for its pool health and job queue."""
+    with _connect(address) as sock, sock.makefile('rwb') as stream:
+        _send(stream, {'op': 'status'})
+        return json.loads(stream.readline())['status']
+
+
+class RemoteFormFiller:
+    """
+    Fills rows with a warm browser leased from a running filler daemon. It
+    has the same interface as FormFiller, so it can be used in a FillerPool;
+    each instance holds one browser until it is closed.
+    """
+    def __init__(self, config: Dict[str, Any], address: Tuple[str, int], fill_mode: str = 'element',
+                 page_reuse: bool = False, block_resources: Optional[List[str]] = None,
+                 recycle_after: Optional[int] = None, max_memory_mb: Optional[float] = None,
+                 max_retries: int = 2, retry_backoff: float = 1.0):
+        if fill_mode not in FILL_MODES:
+            raise ValueError(f"Unknown fill mode '{fill_mode}'. Expected one of: {', '.join(FILL_MODES)}")
+        # The daemon may run from another directory, so send it an absolute form path.
+        job_config = dict(config, form_url=os.path.abspath(config['form_url']))
+        self._sock = _connect(address)
+        self._stream = self._sock.makefile('rwb')
+        reply = self._request({
+            'op': 'start', 'config': job_config, 'fill_mode': fill_mode,
+            'page_reuse': page_reuse, 'block_resources': block_resources,
+            'recycle_after': recycle_after, 'max_memory_mb': max_memory_mb,
+            'max_retries': max_retries, 'retry_backoff': retry_backoff,
+        })
+        if not reply.get('ok'):
+            self.close()
+            raise RuntimeError(reply.get('error') or "The filler daemon refused the job.")
+
+    def _request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        _send(self._stream, message)
+        line = self._stream.readline()
+        if not line:
+            raise ConnectionError("The filler daemon closed the connection.")
+        return json.loads(line)
+
+    def fill_form_for_row(self, data_row: Dict[str, Any]) -> Dict[str, Any]:
+        reply = self._request({'op': 'fill', 'row': data_row, 'fill_values': getattr(data_row, 'fill_values', None)})
+        if not reply.get('ok'):
+            raise RuntimeError(reply.get('error'))
+        result = reply['result']
+        result['data'] = data_row
+        return result
+
+    def close(self):
+        """Hands the browser back to the daemon."""
+        try:
+            _send(self._stream, {'op': 'finish'})
+        except OSError:
+            pass
+        finally:
+            self._stream.close()
+            self._sock.close()
@@ -1,26 +1,368 @@
+import argparse
+import hashlib
+import json
 import pandas as pd
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+from form_filler.form_plan import PLACEHOLDER
+
+# Rows read per pandas chunk when streaming CSV files.
+DEFAULT_CHUNKSIZE = 1000
+
+# Kinds of field where the placeholder would itself be an invalid value, so missing data leaves them unset.
+NO_PLACEHOLDER_KINDS = ['select', 'radio', 'checkbox', 'number', 'range', 'email', 'date', 'datetime-local', 'time']
+
+# Roughly what a browser accepts in an <input type="email">.
+EMAIL_PATTERN = r"[^@\s]+@[A-Za-z0-9-]+(\.[A-Za-z0-9-]+)*"
+
+# The cell texts pandas.read_csv treats as missing by default (its na_values documentation).
+NA_VALUES = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+])
+
+SUPPORTED_EXTENSIONS = ['.csv', '.json', '.jsonl', '.ndjson', '.xls', '.xlsx']
+
+
+def parse_shard(text: str) -> Tuple[int, int]:
+    """Parses 'I/N', the I-th of N shards counting from 1, into (I, N)."""
+    number, _, count = text.partition('/')
+    try:
+        number, count = int(number), int(count)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid shard '{text}'. Expected I/N, e.g. 2/4 for the second of four shards.")
+    if count < 1 or not 1 <= number <= count:
+        raise argparse.ArgumentTypeError(f"Invalid shard '{text}'. I must be between 1 and N.")
+    return number, count
+
+
+def _value_text(value: Any) -> str:
+    """A value written the way it appears in a data file: 28.0 as 28, missing values as ''."""
+    if value is None or value != value:  # None or NaN
+        return ''
+    if isinstance(value, float) and value.is_integer() and abs(value) < 2 ** 53:
+        return str(int(value))
+    return str(value).strip()
+
+
+def _shard_number(key: str, count: int) -> int:
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % count + 1
+
+
+def row_shard(row: Dict[str, Any], count: int) -> int:
+    """
+    Which of `count` shards (counting from 1) a row belongs to. It depends
+    only on the row's values, ignoring column order, case, whitespace and 28
+    vs 28.0, so every process and machine puts a row in the same shard, and
+    copies of a row that only differ cosmetically land in the same one.
+    """
+    key = '\x1f'.join(' '.join(_value_text(row[column]).split()).casefold() for column in sorted(row, key=str))
+    return _shard_number(key, count)
+
+
+def _chunk_shards(df: pd.DataFrame, count: int) -> pd.Series:
+    """row_shard() for every row of a DataFrame, with the text work done a column at a time."""
+    columns = [_as_text(df[column]).str.split().str.join(' ').str.casefold() for column in sorted(df.columns, key=str)]
+    keys = columns[0].str.cat(columns[1:], sep='\x1f') if columns else pd.Series('', index=df.index)
+    return keys.map(lambda key: _shard_number(key, count))
+
+
+def _column_names(header: Tuple[Any, ...]) -> List[Any]:
+    """Names header cells the way pandas does: 'Unnamed: 3' for a blank one, 'email.1' for a repeated one."""
+    names = []
+    seen: Dict[Any, int] = {}
+    for position, name in enumerate(header):
+        if name is None or name == '':
+            name = f"Unnamed: {position}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        seen.setdefault(name, 0)
+        names.append(name)
+    return names
+
+
+def _records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Turns a DataFrame (or chunk of one) into a list of dictionaries."""
+    # Replace Pandas NaN with None for consistent handling
+    df = df.astype(object).where(pd.notna(df), None)
+    return df.to_dict(orient='records')
+
+
+class RowStream:
+    """
+    Iterates over the rows of a CSV, JSON or Excel file without loading the
+    whole file first. While iterating, rows_read and bytes_read tell how far
+    through the file it is. With a shard (I, N), only the rows row_shard()
+    assigns to shard I are yielded; CSV chunks are filtered before their rows
+    are built.
+    """
+    def __init__(self, file_path: str, chunksize: int = DEFAULT_CHUNKSIZE, shard: Optional[Tuple[int, int]] = None):
+        self.path = Path(file_path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"Data file not found at: {file_path}")
+
+        self.extension = self.path.suffix.lower()
+        if self.extension not in SUPPORTED_EXTENSIONS:
+            raise ValueError(f"Unsupported file format: {self.extension}")
+
+        self.chunksize = chunksize
+        self.shard = shard
+        self.rows_in_other_shards = 0
+        self.total_bytes = self.path.stat().st_size
+        self.rows_read = 0
+        self.bytes_read = 0
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if self.extension == '.csv':
+            rows = self._iter_csv()
+        elif self.extension in ['.json', '.jsonl', '.ndjson']:
+            rows = self._iter_json()
+        elif self.extension == '.xlsx':
+            rows = self._iter_xlsx()
+        else:
+            rows = self._iter_xls()
+
+        for row in rows:
+            if self.shard and self.extension != '.csv' and row_shard(row, self.shard[1]) != self.shard[0]:
+                self.rows_in_other_shards += 1
+                continue
+            self.rows_read += 1
+            yield row
+        self.bytes_read = self.total_bytes
+
+    def count_rows(self) -> Optional[int]:
+        """
+        Counts the rows without parsing them, for progress displays. Line-based
+        files are counted by their line breaks, so values spanning several
+        lines make it an overestimate. None for files that can't be counted cheaply.
+        """
+        if self.extension == '.xlsx':
+            from openpyxl import load_workbook
+
+            # read_only mode takes the size from the sheet's stored dimensions.
+            workbook = load_workbook(self.path, read_only=True)
+            try:
+                max_row = workbook.active.max_row
+            finally:
+                workbook.close()
+            return max_row - 1 if max_row else None
+        if self.extension not in ['.csv', '.json', '.jsonl', '.ndjson']:
+            return None
+
+        lines = 0
+        last = b'\n'
+        with open(self.path, 'rb') as f:
+            if self.extension == '.json' and f.read(1024).lstrip().startswith(b'['):
+                return None
+            f.seek(0)
+            for block in iter(lambda: f.read(1 << 20), b''):
+                lines += block.count(b'\n')
+                last = block[-1:]
+        if last != b'\n':
+            lines += 1  # The last line has no line break.
+        return lines - 1 if self.extension == '.csv' else lines
+
+    def progress(self) -> str:
+        """Human-readable progress, e.g. '1200 rows, 0.4 of 2.0 MB read'."""
+        return (f"{self.rows_read} rows, {self.bytes_read / 1_000_000:.1f} "
+                f"of {self.total_bytes / 1_000_000:.1f} MB read")
+
+    def _iter_csv(self) -> Iterator[Dict[str, Any]]:
+        with open(self.path, 'rb') as f:
+            for chunk in pd.read_csv(f, chunksize=self.chunksize):
+                self.bytes_read = f.tell()
+                if self.shard:
+                    mine = _chunk_shards(chunk, self.shard[1]) == self.shard[0]
+                    self.rows_in_other_shards += int((~mine).sum())
+                    chunk = chunk[mine]
+                yield from _records(chunk)
+
+    def _iter_json(self) -> Iterator[Dict[str, Any]]:
+        with open(self.path, 'rb') as f:
+            head = f.read(1024).lstrip()
+            f.seek(0)
+
+            if head.startswith(b'['):
+                # A plain JSON array cannot be streamed; load it in one go.
+                df = pd.read_json(f)
+                self.bytes_read = self.total_bytes
+                yield from _records(df)
+                return
+
+            # Line-delimited JSON: one object per line.
+            for line in f:
+                self.bytes_read += len(line)
+                if line.strip():
+                    yield json.loads(line)
+
+    def _iter_xlsx(self) -> Iterator[Dict[str, Any]]:
+        from openpyxl import load_workbook
+
+        # read_only mode streams rows from the sheet instead of building the whole workbook.
+        workbook = load_workbook(self.path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = _column_names(header)
+            for values in rows:
+                # Cells reading 'NA', 'None', 'N/A' etc. are missing, as they are when pandas reads a CSV.
+                values = [None if isinstance(value, str) and value in NA_VALUES else value for value in values]
+                if all(value is None for value in values):
+                    continue
+                yield dict(zip(columns, values))
+        finally:
+            workbook.close()
+
+    def _iter_xls(self) -> Iterator[Dict[str, Any]]:
+        # Legacy .xls files cannot be streamed by openpyxl.
+        df = pd.read_excel(self.path)
+        self.bytes_read = self.total_bytes
+        yield from _records(df)
+
+
+def iter_rows(file_path: str, chunksize: int = DEFAULT_CHUNKSIZE, shard: Optional[Tuple[int, int]] = None) -> RowStream:
+    """
+    Lazily reads rows from a CSV, JSON (array or line-delimited) or Excel file,
+    optionally only those of one shard.
+    """
+    return RowStream(file_path, chunksize=chunksize, shard=shard)
+
 
 def load_data(file_path: str) -> List[Dict[str, Any]]:
     """
     Loads data from a CSV, JSON, or Excel file into a list of dictionaries.
     """
-    path = Path(file_path)
-    if not path.exists():
-        raise FileNotFoundError(f"Data file not found at: {file_path}")
-
-    file_extension = path.suffix.lower()
-    
-    if file_extension == '.csv':
-        df = pd.read_csv(file_path)
-    elif file_extension == '.json':
-        df = pd.read_json(file_path)
-    elif file_extension in ['.xls', '.xlsx']:
-        df = pd.read_excel(file_path, engine='openpyxl')
+    return list(iter_rows(file_path))
+
+
+class CheckedRow(dict):
+    """
+    A data row that went through the pre-flight check. It holds the row
+    exactly as it was read; fill_values maps each data key to the
+    (form field name, value) to fill, and reason says why the row cannot be
+    submitted, or is None when it can.
+    """
+    def __init__(self, row: Dict[str, Any], fill_values: Dict[str, Tuple[str, Any]], reason: Optional[str] = None):
+        super().__init__(row)
+        self.fill_values = fill_values
+        self.reason = reason
+
+
+def _as_text(column: pd.Series) -> pd.Series:
+    """The values of a column as stripped strings, with 28.0 written as 28 and missing values as ''."""
+    if column.dtype.kind == 'f':
+        # Integer columns with gaps are read as floats; write them the way they appear in the file.
+        integral = column.notna() & (column % 1 == 0) & (column.abs() < 2 ** 53)
+        text = column.astype(str)
+        text[integral] = column[integral].astype('int64').astype(str)
+    elif column.dtype.kind == 'O':
+        text = column.map(_value_text)
     else:
-        raise ValueError(f"Unsupported file format: {file_extension}")
+        text = column.astype(str)
+    return text.where(column.notna(), '').str.strip()
 
-    # Replace Pandas NaN with None for consistent handling
-    df = df.where(pd.notna(df), None)
-    return df.to_dict(orient='records')
\ No newline at end of file
+
+def _check_column(column: pd.Series, field: Dict[str, Any]) -> Tuple[pd.Series, pd.Series, int]:
+    """
+    Checks one data column against its form field. Returns the values to fill
+    (None leaves the field untouched), the problem found in each row ('' if
+    none) and how many placeholders were used.
+    """
+    name, kind, options = field['name'], field['kind'], field['options']
+    text = _as_text(column)
+    missing = text == ''
+    values = text.astype(object)
+    problems = pd.Series('', index=column.index, dtype=object)
+
+    if options is not None:
+        # Accept any capitalization, but fill in the option exactly as the form spells it.
+        canonical = {str(option).strip().casefold(): option for option in reversed(options)}
+        values = text.str.casefold().map(canonical).astype(object)
+        bad = ~missing & values.isna()
+        problems[bad] = [f"Value '{value}' is not one of the options for '{name}': {options}" for value in text[bad]]
+    elif kind in ['number', 'range']:
+        bad = ~missing & pd.to_numeric(text.where(~missing), errors='coerce').isna()
+        problems[bad] = [f"Value '{value}' for '{name}' is not a number" for value in text[bad]]
+    elif kind == 'email':
+        bad = ~missing & ~text.str.fullmatch(EMAIL_PATTERN)
+        problems[bad] = [f"Value '{value}' for '{name}' is not an email address" for value in text[bad]]
+    elif kind == 'checkbox':
+        # Checkboxes are ticked by truthiness, so keep the original values.
+        values = column.astype(object)
+
+    if options is None and kind not in NO_PLACEHOLDER_KINDS:
+        return values.where(~missing, PLACEHOLDER), problems, int(missing.sum())
+
+    if field['required']:
+        problems[missing] = f"Required field '{name}' has no value"
+    return values.where(~missing & values.notna(), None), problems, 0
+
+
+class Preflight:
+    """
+    Checks rows against what the form accepts before any of them reach a
+    browser: option sets, required fields, numbers and email addresses. Rows
+    are checked a chunk at a time, column by column. Placeholders and
+    normalized values are worked out here too, so fillers only fill.
+    """
+    def __init__(self, config: Dict[str, Any], plan: Dict[str, Any], chunksize: int = DEFAULT_CHUNKSIZE):
+        self.field_mappings = config['field_mappings']
+        self.fields = plan['fields']
+        self.chunksize = chunksize
+        self.rows_checked = 0
+        self.invalid = 0
+        self.placeholders: Dict[str, int] = {}
+
+    def check(self, rows: Iterable[Dict[str, Any]]) -> Iterator[CheckedRow]:
+        """Yields every row as a CheckedRow, in order."""
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunksize:
+                yield from self._check_chunk(chunk)
+                chunk = []
+        if chunk:
+            yield from self._check_chunk(chunk)
+
+    def _check_chunk(self, rows: List[Dict[str, Any]]) -> Iterator[CheckedRow]:
+        df = pd.DataFrame.from_records(rows, index=range(len(rows)))
+        values, problems = {}, []
+        for data_key, field in self.fields.items():
+            if data_key in df:
+                column = df[data_key]
+            else:
+                column = pd.Series(None, index=df.index, dtype=object)
+            values[data_key], column_problems, placeholders = _check_column(column, field)
+            problems.append(column_problems)
+            if placeholders:
+                self.placeholders[data_key] = self.placeholders.get(data_key, 0) + placeholders
+
+        reasons = [None] * len(rows)
+        if problems:
+            problem_frame = pd.concat(problems, axis=1)
+            for position, row_problems in problem_frame[(problem_frame != '').any(axis=1)].iterrows():
+                reasons[position] = "; ".join(problem for problem in row_problems if problem)
+        # Plain lists are much quicker to walk row by row than the frame itself.
+        targets = [(data_key, self.field_mappings[data_key]) for data_key in values]
+        columns = [column.tolist() for column in values.values()]
+        value_rows = zip(*columns) if columns else [()] * len(rows)
+
+        self.rows_checked += len(rows)
+        self.invalid += sum(reason is not None for reason in reasons)
+        for row, row_values, reason in zip(rows, value_rows, reasons):
+            fill_values = {
+                data_key: (form_field_name, value)
+                for (data_key, form_field_name), value in zip(targets, row_values) if value is not None
+            }
+            yield CheckedRow(row, fill_values, reason)
+
+    def summary_lines(self) -> List[str]:
+        lines = [f"{self.rows_checked} rows checked, {self.invalid} invalid (not submitted)."]
+        for data_key, count in self.placeholders.items():
+            lines.append(f"Used placeholder '{PLACEHOLDER}' for {count} empty values of '{data_key}'.")
+        return lines
@@ -0,0 +1,147 @@
+import re
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from rapidfuzz import fuzz, process, utils
+
+# SciPy's assignment solver is much faster on very wide forms; use it when installed.
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    linear_sum_assignment = None
+
+# How much each kind of field text counts. Labels are written for people, so they are
+# the most trustworthy; attribute names are often abbreviated or generated.
+SIGNAL_WEIGHTS = {'label': 1.0, 'placeholder': 0.95, 'name': 0.9, 'id': 0.9}
+
+# A match is flagged as ambiguous when another candidate scores within this many points.
+AMBIGUITY_MARGIN = 5.0
+
+
+def _humanize(text: str) -> str:
+    """Splits camelCase and snake_case identifiers into words, so 'contactEmail' reads like 'contact email'."""
+    text = re.sub(r'([a-z0-9])([A-Z])', r'\1 \2', text)
+    return utils.default_process(text)
+
+
+def _hungarian(cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Minimum-cost assignment of every row to a distinct column (rows <= columns),
+    for when SciPy is not installed. Shortest augmenting paths with potentials,
+    O(rows^2 * columns), with the inner loops over columns done by numpy.
+    """
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    owner = np.zeros(m + 1, dtype=int)  # owner[j]: 1-based row assigned to column j, 0 if free
+    way = np.zeros(m + 1, dtype=int)
+    for row in range(1, n + 1):
+        owner[0] = row
+        col = 0
+        min_reduced = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[col] = True
+            current = owner[col]
+            free = ~used[1:]
+            reduced = cost[current - 1] - u[current] - v[1:]
+            better = free & (reduced < min_reduced[1:])
+            min_reduced[1:][better] = reduced[better]
+            way[1:][better] = col
+            candidates = np.where(free, min_reduced[1:], np.inf)
+            next_col = int(np.argmin(candidates)) + 1
+            delta = candidates[next_col - 1]
+            u[owner[used]] += delta
+            v[used] -= delta
+            min_reduced[~used] -= delta
+            col = next_col
+            if owner[col] == 0:
+                break
+        # Flip the augmenting path.
+        while col:
+            previous = way[col]
+            owner[col] = owner[previous]
+            col = previous
+
+    cols = np.nonzero(owner[1:])[0]
+    rows = owner[1:][cols] - 1
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
+def optimal_assignment(scores: np.ndarray) -> List[Tuple[int, int]]:
+    """Pairs rows with columns, each used at most once, so the total score is as high as possible."""
+    if scores.size == 0:
+        return []
+    if linear_sum_assignment is not None:
+        rows, cols = linear_sum_assignment(scores, maximize=True)
+        return list(zip(rows.tolist(), cols.tolist()))
+
+    transposed = scores.shape[0] > scores.shape[1]
+    matrix = scores.T if transposed else scores
+    rows, cols = _hungarian(matrix.max() - matrix)
+    if transposed:
+        rows, cols = cols, rows
+    return sorted(zip(rows.tolist(), cols.tolist()))
+
+
+def match_headers(headers: List[str], field_signals: Dict[str, List[Tuple[str, str]]],
+                  threshold: float) -> Dict[str, Dict[str, Any]]:
+    """
+    Matches data headers to form fields one-to-one. Every header is scored
+    against every field text in one vectorized pass, each field keeps its best
+    signal, and the assignment with the highest total score wins, so two
+    headers never claim the same field. Returns a report per header, in order:
+    the field (or None and a best guess), the text and signal that matched,
+    the score, the runner-up field, and whether the match is ambiguous.
+    """
+    field_names = list(field_signals)
+    texts, owners, signals, weights = [], [], [], []
+    for index, name in enumerate(field_names):
+        for signal, text in field_signals[name]:
+            texts.append(text)
+            owners.append(index)
+            signals.append(signal)
+            weights.append(SIGNAL_WEIGHTS.get(signal, 1.0))
+
+    report = {header: {'field': None, 'text': None, 'signal': None, 'score': 0.0,
+                       'runner_up': None, 'ambiguous': False, 'best_guess': None} for header in headers}
+    if not headers or not texts:
+        return report
+
+    # headers x texts, then the best text of each field: headers x fields.
+    text_scores = process.cdist(
+        [_humanize(header) for header in headers], [_humanize(text) for text in texts],
+        scorer=fuzz.WRatio, dtype=np.float32, workers=-1,
+    ) * np.asarray(weights, dtype=np.float32)
+    starts = np.flatnonzero(np.r_[True, np.diff(owners) != 0])
+    ends = np.r_[starts[1:], len(texts)]
+    scores = np.maximum.reduceat(text_scores, starts, axis=1)
+
+    # Below-threshold pairs are worth nothing, so they never displace a confident match.
+    eligible = np.where(scores >= threshold, scores, 0.0)
+    assigned = {row: col for row, col in optimal_assignment(eligible) if eligible[row, col] > 0}
+
+    for row, header in enumerate(headers):
+        entry = report[header]
+        ranked = np.argsort(-scores[row], kind='stable')
+        col = assigned.get(row, int(ranked[0]))
+        text_index = starts[col] + int(np.argmax(text_scores[row, starts[col]:ends[col]]))
+        entry['score'] = round(float(scores[row, col]), 1)
+        entry['text'], entry['signal'] = texts[text_index], signals[text_index]
+        if row not in assigned:
+            # No field, but keep the best guess so the output explains the miss.
+            entry['best_guess'] = field_names[col]
+            continue
+
+        entry['field'] = field_names[col]
+        others = [other for other in ranked if other != col]
+        if others:
+            entry['runner_up'] = {'field': field_names[others[0]], 'score': round(float(scores[row, others[0]]), 1)}
+        # Ambiguous if the header nearly matched another field, or another header nearly matched this field.
+        rival_headers = np.delete(scores[:, col], row)
+        entry['ambiguous'] = bool(
+            (others and scores[row, others[0]] >= scores[row, col] - AMBIGUITY_MARGIN)
+            or (rival_headers.size and rival_headers.max() >= scores[row, col] - AMBIGUITY_MARGIN)
+        )
+    return report
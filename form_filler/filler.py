@@ -1,102 +1,273 @@
 import os
 import time
-import random
-from typing import Dict, Any
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support.ui import Select
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
 from selenium.webdriver.chrome.service import Service as ChromeService
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.options import Options as ChromeOptions
+
+from form_filler.bulk_fill import BULK_FILL_SCRIPT, to_script_value
+from form_filler.form_plan import blocked_url_patterns, compile_form_plan, fill_values_for_row
+from form_filler.verification import SuccessCondition
+from form_filler.metrics import PhaseTimer
+
+# psutil measures how much memory the browser uses; without it, memory-based recycling is off.
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+FILL_MODES = ('element', 'bulk')
+
+# Puts every form on the page back to its defaults, as if freshly loaded.
+# Returns false when there is no fully loaded form to reuse.
+RESET_FORM_SCRIPT = """
+if (document.readyState !== 'complete' || !document.forms.length) { return false; }
+for (var i = 0; i < document.forms.length; i++) { document.forms[i].reset(); }
+return true;
+"""
+
+def driver_alive(driver) -> bool:
+    """A cheap round trip to the browser, to catch one that crashed or hung up."""
+    try:
+        driver.current_url
+        return True
+    except WebDriverException:
+        return False
+
+def browser_memory_mb(driver) -> Optional[float]:
+    """Resident memory of chromedriver and every browser process under it, or None if it cannot be measured."""
+    if psutil is None:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root, *root.children(recursive=True)]
+    except (AttributeError, psutil.Error):
+        return None
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            continue  # Exited while we were looking.
+    return round(total / 1_000_000, 1)
+
+def create_driver(headless: bool = False) -> webdriver.Chrome:
+    """Starts chromedriver and Chrome from the chromedriver.exe next to the project."""
+    chrome_options = ChromeOptions()
+    
+    if headless:
+        chrome_options.add_argument("--headless")
+        chrome_options.add_argument("--window-size=1920,1080")
+    
+    # 1. Define the path RELATIVE to your project root.
+    #    This is much cleaner and more reliable.
+    driver_path = os.path.abspath("chromedriver.exe")
+    
+    # 2. Check if the file actually exists before trying to use it.
+    #    This provides a much better error message.
+    if not os.path.exists(driver_path):
+        raise FileNotFoundError(
+            f"ChromeDriver not found at the expected path: {driver_path}\n"
+            "Please make sure 'chromedriver.exe' is in your main project directory, next to 'gui.py'."
+        )
+        
+    # 3. Create the service with the now-verified executable path.
+    service = ChromeService(executable_path=driver_path)
+
+    # 4. Initialize the driver. This will now work.
+    driver = webdriver.Chrome(
+        service=service,
+        options=chrome_options
+    )
+    driver.implicitly_wait(5)
+    return driver
+
 class FormFiller:
-    def __init__(self, config: Dict[str, Any], randomize_delay: bool = True, headless: bool = False):
+    def __init__(self, config: Dict[str, Any], headless: bool = False, fill_mode: str = 'element',
+                 driver: Optional[webdriver.Chrome] = None, recycle_after: Optional[int] = None,
+                 max_memory_mb: Optional[float] = None, max_retries: int = 2, retry_backoff: float = 1.0,
+                 page_reuse: bool = False, block_resources: Optional[List[str]] = None,
+                 launch: Callable[[bool], webdriver.Chrome] = create_driver):
+        if fill_mode not in FILL_MODES:
+            raise ValueError(f"Unknown fill mode '{fill_mode}'. Expected one of: {', '.join(FILL_MODES)}")
         self.config = config
-        self.randomize_delay = randomize_delay
-        chrome_options = ChromeOptions()
-        
-        if headless:
-            chrome_options.add_argument("--headless")
-            chrome_options.add_argument("--window-size=1920,1080")
-        
-        # 1. Define the path RELATIVE to your project root.
-        #    This is much cleaner and more reliable.
-        driver_path = os.path.abspath("chromedriver.exe")
-        
-        # 2. Check if the file actually exists before trying to use it.
-        #    This provides a much better error message.
-        if not os.path.exists(driver_path):
-            raise FileNotFoundError(
-                f"ChromeDriver not found at the expected path: {driver_path}\n"
-                "Please make sure 'chromedriver.exe' is in your main project directory, next to 'gui.py'."
-            )
-            
-        # 3. Create the service with the now-verified executable path.
-        service = ChromeService(executable_path=driver_path)
+        # 'element' drives each field through WebDriver; 'bulk' fills the whole row in one script call.
+        self.fill_mode = fill_mode
+        # Field kinds, option sets and the submit locator are worked out once, up front,
+        # so rows never have to ask the DOM what kind of element they are filling.
+        self.plan = compile_form_plan(config)
+        self._submit_locator = (self.plan['submit']['by'], self.plan['submit']['value'])
+        self.form_url = 'file:///' + os.path.abspath(config['form_url']).replace('\\', '/')
+        # With page reuse, rows after the first reset the loaded form instead of fetching it again.
+        self.page_reuse = page_reuse
+        self._form_loaded = False
+        # Requests the browser is told to drop, e.g. third-party stylesheets; see RESOURCE_KINDS.
+        self.blocked_urls = blocked_url_patterns(self.plan, block_resources or [])
+        self.success_condition = SuccessCondition(config.get('success_condition'))
+        self._timer = PhaseTimer()
+        # A browser handed in (e.g. by the filler daemon) is borrowed: close() leaves it running.
+        self._owns_driver = driver is None
+        self.headless = headless
+        # How replacement browsers are started; the daemon passes its pool's, so they are counted there.
+        self._launch = launch
+        self.driver = driver or launch(headless)
+        self._prepare_driver()
 
-        # 4. Initialize the driver. This will now work.
-        self.driver = webdriver.Chrome(
-            service=service,
-            options=chrome_options
-        )
-        self.driver.implicitly_wait(5)
+        # Browser lifecycle: a fresh browser every recycle_after rows or once it uses more than
+        # max_memory_mb, and up to max_retries relaunches (with exponential backoff) when it crashes.
+        self.recycle_after = recycle_after
+        self.max_memory_mb = max_memory_mb
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.rows_since_launch = 0
+        self.memory_mb = None
+        self.restarts = 0
+        self._submitted = False
+        if max_memory_mb and psutil is None:
+            print("Warning: psutil is not installed, so the browser's memory cannot be measured or limited.")
+
+    def _prepare_driver(self):
+        """Applies the per-browser settings; called for every newly launched or borrowed browser."""
+        self._form_loaded = False
+        if self.blocked_urls:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_urls})
+
+    def _on_form_page(self) -> bool:
+        current = urlsplit(self.driver.current_url)
+        form = urlsplit(self.form_url)
+        # Compare paths only: a GET form adds a query string, and 'file:////x' is the same file as 'file:///x'.
+        return current.scheme == 'file' and unquote(current.path).lstrip('/') == unquote(form.path).lstrip('/')
+
+    def _open_form(self):
+        """Puts a blank copy of the form in front of the browser, reusing the loaded page when allowed."""
+        if self.page_reuse and self._form_loaded:
+            if not self._on_form_page():
+                # Usually the success page: going back restores the form from the browser's page cache.
+                self.driver.back()
+            if self._on_form_page() and self.driver.execute_script(RESET_FORM_SCRIPT):
+                # Resetting leaves the previous row's success message in the page. If the
+                # condition could see it, the next row would pass before it was submitted.
+                if not (self.success_condition.reads_page and self.success_condition.is_met(self.driver)):
+                    return
+                # The form shows its success message in place, so it has to be loaded for every row.
+                print(
+                    f"Info: Page reuse is off for this form: its success condition "
+                    f"({self.success_condition.describe()}) still holds after the form is reset."
+                )
+                self.page_reuse = False
+        self.driver.get(self.form_url)
+        self._form_loaded = True
+
+    def _restart_driver(self, reason: str):
+        """Replaces the browser with a freshly launched one."""
+        print(f"Info: Restarting the browser ({reason}).")
+        # A borrowed browser is quit as well: its lender takes the replacement back instead.
+        try:
+            self.driver.quit()
+        except Exception:
+            pass  # Most likely it is already gone.
+        self.driver = None
+        self.driver = self._launch(self.headless)
+        self._owns_driver = True
+        self._prepare_driver()
+        self.rows_since_launch = 0
+        self.memory_mb = None
+        self.restarts += 1
+
+    def _check_driver(self):
+        """Between rows: relaunches a browser that stopped responding and recycles a worn one."""
+        if self.driver is None or not driver_alive(self.driver):
+            self._restart_driver("it stopped responding")
+        elif self.recycle_after and self.rows_since_launch >= self.recycle_after:
+            self._restart_driver(f"recycled after {self.rows_since_launch} rows")
+        elif self.max_memory_mb and self.memory_mb and self.memory_mb > self.max_memory_mb:
+            self._restart_driver(f"recycled at {self.memory_mb:g} MB")
     def _get_element(self, by: By, value: str) -> WebElement:
         """Finds an element with robust error handling."""
         try:
-            return self.driver.find_element(by, value)
+            with self._timer.phase('locate'):
+                return self.driver.find_element(by, value)
         except NoSuchElementException:
             raise NoSuchElementException(f"Error: Could not find element with {by}='{value}'")
 
-    def _human_like_delay(self):
-        """Adds a short, random delay to simulate human behavior."""
-        if self.randomize_delay:
-            time.sleep(random.uniform(0.3, 1.0))
-
     def fill_form_for_row(self, data_row: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Fills and submits the form for one row. The result includes the row's
+        latency and a per-phase breakdown ('timings') in seconds, plus how many
+        times it was retried, how often the browser was restarted for it and
+        the browser's memory afterwards.
+        """
+        started = time.monotonic()
+        self._timer = PhaseTimer()
+        restarts_before = self.restarts
+        retries = 0
+        while True:
+            self._check_driver()
+            self._submitted = False
+            result = self._fill_and_submit(data_row)
+            self.rows_since_launch += 1
+            if result['status'] == 'SUCCESS' or driver_alive(self.driver):
+                break
+            # The browser died under this row. Once the form was submitted a retry could send it
+            # twice, so only earlier crashes are retried; the next row gets a new browser either way.
+            if self._submitted or retries >= self.max_retries:
+                break
+            retries += 1
+            time.sleep(self.retry_backoff * 2 ** (retries - 1))
+            self._restart_driver(f"crashed, retry {retries} of {self.max_retries}")
+
+        self.memory_mb = browser_memory_mb(self.driver)
+        result['latency'] = round(time.monotonic() - started, 3)
+        result['timings'] = self._timer.rounded()
+        result['retries'] = retries
+        result['browser_restarts'] = self.restarts - restarts_before
+        result['browser_memory_mb'] = self.memory_mb
+        return result
+
+    def _fill_and_submit(self, data_row: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            form_url = self.config['form_url']
-            full_url = 'file:///' + os.path.abspath(form_url).replace('\\', '/')
-            self.driver.get(full_url)
-            self._human_like_delay()
+            with self._timer.phase('navigate'):
+                self._open_form()
 
             # --- START OF MODIFIED LOGIC ---
-            # Fill in the fields
-            for data_key, form_field_name in self.config['field_mappings'].items():
-                # Get the value from the data row, or use None if the key doesn't exist.
-                value = data_row.get(data_key)
-
-                # If the value is None or an empty string, use a placeholder.
-                # Otherwise, use the actual value.
-                if value is None or str(value).strip() == "":
-                    fill_value = "N/A" # Our placeholder for required fields
-                    print(f"Info: Using placeholder '{fill_value}' for empty field '{data_key}'.")
+            # Work out what goes into every field first, then fill them all.
+            field_values = fill_values_for_row(self.config, data_row)
+
+            with self._timer.phase('fill'):
+                if self.fill_mode == 'bulk':
+                    error = self._fill_fields_bulk(field_values)
                 else:
-                    fill_value = value
-                
-                # Now, fill the element with the determined value.
-                try:
-                    element = self._get_element(By.NAME, form_field_name)
-                    self._fill_element(element, fill_value)
-                    self._human_like_delay()
-                except NoSuchElementException as e:
-                    return {'status': 'FAILED', 'reason': str(e), 'data': data_row}
+                    error = self._fill_fields_by_element(field_values)
+            if error:
+                return {'status': 'FAILED', 'reason': error, 'data': data_row}
             # --- END OF MODIFIED LOGIC ---
             
             # Click the submit button
-            submit_info = self.config['submit_button']
-            submit_by = getattr(By, submit_info['type'].upper())
-            submit_button = self._get_element(submit_by, submit_info['value'])
-            submit_button.click()
+            with self._timer.phase('submit'):
+                submit_button = self._get_element(*self._submit_locator)
+                submit_button.click()
+                self._submitted = True
             
-            # Check for success
+            # Check for success: poll until the condition holds instead of sleeping a fixed time.
             try:
-                time.sleep(1)
-                if "success.html" in self.driver.current_url:
+                with self._timer.phase('verify'):
+                    verified = self.success_condition.wait(self.driver)
+                if verified:
                     return {'status': 'SUCCESS', 'reason': 'Form submitted successfully.', 'data': data_row}
                 else:
-                    return {'status': 'FAILED', 'reason': 'Submission did not lead to the expected success page.', 'data': data_row}
+                    return {
+                        'status': 'FAILED',
+                        'reason': f"Success condition ({self.success_condition.describe()}) not met within {self.success_condition.timeout:g}s.",
+                        'data': data_row
+                    }
             except WebDriverException as e:
                 return {'status': 'CRASHED', 'reason': f'Browser window closed unexpectedly after submission. Error: {e.__class__.__name__}', 'data': data_row}
 
@@ -105,6 +276,79 @@ class FormFiller:
         except Exception as e:
             return {'status': 'FAILED', 'reason': f"An unexpected Python error occurred: {e}", 'data': data_row}
 
+    def _fill_fields_by_element(self, field_values: Dict[str, Tuple[str, Any]]) -> Optional[str]:
+        """Fills fields one at a time through WebDriver. Returns an error message on failure."""
+        for data_key, (form_field_name, fill_value) in field_values.items():
+            field = self.plan['fields'].get(data_key)
+            try:
+                if field and field['kind'] != 'unknown':
+                    error = self._fill_planned_field(field, fill_value)
+                    if error:
+                        return error
+                else:
+                    element = self._get_element(By.NAME, form_field_name)
+                    self._fill_element(element, fill_value)
+            except NoSuchElementException as e:
+                return str(e)
+        return None
+
+    def _fill_planned_field(self, field: Dict[str, Any], value: Any) -> Optional[str]:
+        """Fills a field whose kind is already known from the compiled plan."""
+        name, kind, options = field['name'], field['kind'], field['options']
+        if options is not None and str(value) not in options:
+            return f"Value '{value}' is not one of the options for '{name}': {options}"
+
+        if kind == 'select':
+            Select(self._get_element(By.NAME, name)).select_by_value(str(value))
+        elif kind == 'radio':
+            # Go straight to the matching option; no need to look at the group first.
+            self._get_element(By.CSS_SELECTOR, f"input[name='{name}'][value='{value}']").click()
+        elif kind == 'checkbox':
+            if value:
+                self._get_element(By.NAME, name).click()
+        else:
+            element = self._get_element(By.NAME, name)
+            element.clear()
+            element.send_keys(str(value))
+        return None
+
+    def _fill_fields_bulk(self, field_values: Dict[str, Tuple[str, Any]]) -> Optional[str]:
+        """
+        Fills all fields with a single injected script. Fields listed under
+        'keystroke_fields' in the config, and fields the script cannot handle,
+        fall back to the per-element path. Returns an error message on failure.
+        """
+        keystroke_fields = set(self.config.get('keystroke_fields', []))
+        scripted = {
+            form_field_name: to_script_value(fill_value)
+            for data_key, (form_field_name, fill_value) in field_values.items()
+            if data_key not in keystroke_fields
+        }
+        fallback = {
+            data_key: field for data_key, field in field_values.items()
+            if data_key in keystroke_fields
+        }
+
+        if scripted:
+            outcome = self.driver.execute_script(BULK_FILL_SCRIPT, scripted) or {}
+            errors = []
+            for data_key, (form_field_name, fill_value) in field_values.items():
+                if form_field_name not in scripted:
+                    continue
+                field_result = outcome.get(form_field_name, {})
+                if field_result.get('ok'):
+                    continue
+                if field_result.get('fallback'):
+                    fallback[data_key] = (form_field_name, fill_value)
+                else:
+                    errors.append(field_result.get('reason') or f"Could not fill field '{form_field_name}'")
+            if errors:
+                return "; ".join(errors)
+
+        if fallback:
+            return self._fill_fields_by_element(fallback)
+        return None
+
     def _fill_element(self, element: WebElement, value: Any):
         """Fills a single form element based on its type."""
         elem_type = element.get_attribute('type')
@@ -127,6 +371,6 @@ class FormFiller:
             print(f"Warning: Unsupported element type for '{element.get_attribute('name')}'")
 
     def close(self):
-        """Closes the WebDriver."""
-        if self.driver:
+        """Closes the WebDriver, unless it was borrowed."""
+        if self.driver and self._owns_driver:
             self.driver.quit()
\ No newline at end of file
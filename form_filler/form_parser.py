@@ -0,0 +1,222 @@
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from bs4 import BeautifulSoup
+
+# lxml parses large forms many times faster than the built-in parser; use it when installed.
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Input types that never carry user data.
+BUTTON_TYPES = ['submit', 'button', 'reset']
+
+
+def load_form_soup(form_path: str) -> BeautifulSoup:
+    """Parses a local HTML form file."""
+    path = Path(form_path)
+    if not path.exists():
+        raise FileNotFoundError(f"Form file not found at: {form_path}")
+
+    with open(path, 'r', encoding='utf-8') as f:
+        return BeautifulSoup(f, HTML_PARSER)
+
+
+def build_label_index(soup) -> Dict[str, str]:
+    """Maps each element id to the text of its <label for="...">, in one pass over the document."""
+    index = {}
+    for label in soup.find_all('label'):
+        target = label.get('for')
+        # Like soup.find, the first label for an id wins.
+        if target and target not in index:
+            index[target] = label.get_text(strip=True)
+    return index
+
+
+def get_label_for_element(element, soup, label_index: Optional[Dict[str, str]] = None):
+    """
+    Tries to find the human-readable label for a form element. Pass a
+    label_index from build_label_index when labelling many elements, so the
+    document is not searched again for every one of them.
+    """
+    # 1. Check for a <label for="element_id">
+    if element.get('id'):
+        if label_index is not None:
+            label_text = label_index.get(element['id'])
+            if label_text:
+                return label_text
+        else:
+            label = soup.find('label', {'for': element['id']})
+            if label:
+                return label.get_text(strip=True)
+
+    # 2. Check if the element is wrapped in a <label>
+    parent_label = element.find_parent('label')
+    if parent_label:
+        return parent_label.get_text(strip=True)
+
+    # 3. Look for a <label> that is an immediate sibling
+    prev_sibling = element.find_previous_sibling()
+    if prev_sibling and prev_sibling.name == 'label':
+        return prev_sibling.get_text(strip=True)
+
+    return None
+
+
+def find_submit_button(soup):
+    """Heuristically finds the submit button."""
+    # Look for button or input with type=submit
+    buttons = soup.find_all(['button', 'input'])
+    for button in buttons:
+        if button.get('type') == 'submit':
+            # Prefer ID, then name
+            if button.get('id'):
+                return {"type": "id", "value": button['id']}
+            if button.get('name'):
+                return {"type": "name", "value": button['name']}
+    return {"type": "css_selector", "value": "[type='submit']"} # Fallback
+
+
+def describe_fields(soup) -> Dict[str, Dict[str, Any]]:
+    """
+    Collects what the form says about each named field: its kind
+    (select, radio, checkbox, textarea or the input type), the values it
+    accepts, and whether it is required. Radio buttons sharing a name are
+    merged into one field.
+    """
+    fields = {}
+    for element in soup.find_all(['input', 'select', 'textarea']):
+        name = element.get('name')
+        elem_type = (element.get('type') or 'text').lower()
+        if not name or (element.name == 'input' and elem_type in BUTTON_TYPES):
+            continue
+
+        if element.name == 'select':
+            kind = 'select'
+            options = [opt.get('value', opt.get_text(strip=True)) for opt in element.find_all('option')]
+        elif element.name == 'textarea':
+            kind, options = 'textarea', None
+        elif elem_type == 'radio':
+            kind, options = 'radio', [element.get('value', 'on')]
+        else:
+            kind, options = elem_type, None
+
+        field = fields.get(name)
+        if field is None:
+            fields[name] = {
+                'kind': kind,
+                'options': options,
+                'required': element.has_attr('required'),
+                # What a ticked checkbox submits.
+                'value': element.get('value', 'on') if kind == 'checkbox' else None,
+            }
+        elif kind == 'radio' and field['kind'] == 'radio':
+            field['options'].extend(options)
+            field['required'] = field['required'] or element.has_attr('required')
+    return fields
+
+
+def _default_values(element) -> List[str]:
+    """Values a field would submit if the user left it untouched."""
+    if element.name == 'select':
+        options = element.find_all('option')
+        chosen = [opt for opt in options if opt.has_attr('selected')] or options[:1]
+        return [opt.get('value', opt.get_text(strip=True)) for opt in chosen]
+    if element.name == 'textarea':
+        return [element.get_text()]
+    elem_type = (element.get('type') or 'text').lower()
+    if elem_type in ['radio', 'checkbox']:
+        return [element.get('value', 'on')] if element.has_attr('checked') else []
+    return [element.get('value', '')]
+
+
+def _find_submit_element(form, submit_button: Dict[str, str]):
+    """Finds the element a config's submit_button locator points at, when it can be done without a browser."""
+    locator_type = submit_button['type'].lower()
+    if locator_type == 'id':
+        return form.find(id=submit_button['value'])
+    if locator_type == 'name':
+        return form.find(attrs={'name': submit_button['value']})
+    if locator_type == 'css_selector':
+        return form.select_one(submit_button['value'])
+    return None
+
+
+def describe_form(soup, submit_button: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Reads what a browser would need to submit the form itself: its action,
+    method and encoding, the values every field submits by default, and the
+    name/value pair of the submit button (if it has a name).
+    """
+    form = soup.find('form')
+    if form is None:
+        raise ValueError("No <form> element found in the HTML.")
+
+    defaults: List[Tuple[str, str]] = []
+    for element in form.find_all(['input', 'select', 'textarea']):
+        name = element.get('name')
+        elem_type = (element.get('type') or 'text').lower()
+        if not name or element.has_attr('disabled') or (element.name == 'input' and elem_type in BUTTON_TYPES):
+            continue
+        defaults.extend((name, value) for value in _default_values(element))
+
+    submit_field = None
+    if submit_button:
+        submit_element = _find_submit_element(form, submit_button)
+        if submit_element is not None and submit_element.get('name'):
+            submit_field = (submit_element['name'], submit_element.get('value', ''))
+
+    return {
+        'action': form.get('action', ''),
+        'method': (form.get('method') or 'get').upper(),
+        'enctype': (form.get('enctype') or 'application/x-www-form-urlencoded').lower(),
+        'defaults': defaults,
+        'submit_field': submit_field,
+    }
+
+
+def collect_field_signals(soup) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    Gathers every piece of text that hints at what a field is for, grouped
+    by field name: its labels, its name and id attributes, and its
+    placeholder. Radio buttons sharing a name pool their signals.
+    """
+    label_index = build_label_index(soup)
+    signals: Dict[str, List[Tuple[str, str]]] = {}
+    for element in soup.find_all(['input', 'select', 'textarea']):
+        name = element.get('name')
+        elem_type = (element.get('type') or 'text').lower()
+        if not name or (element.name == 'input' and elem_type in BUTTON_TYPES):
+            continue
+
+        found = signals.setdefault(name, [('name', name)])
+        candidates = [
+            ('label', get_label_for_element(element, soup, label_index)),
+            ('id', element.get('id')),
+            ('placeholder', element.get('placeholder')),
+        ]
+        for signal, text in candidates:
+            if text and (signal, text) not in found:
+                found.append((signal, text))
+    return signals
+
+
+def third_party_hosts(soup) -> List[str]:
+    """
+    Hosts the page pulls stylesheets, scripts, images or frames from, other
+    than the host the form submits to. The forms themselves are local files,
+    so every network host they load from is a third party.
+    """
+    form = soup.find('form')
+    action_host = urlsplit(form.get('action', '')).hostname if form is not None else None
+    hosts = []
+    for element in soup.find_all(['link', 'script', 'img', 'iframe', 'source']):
+        url = element.get('href') or element.get('src') or ''
+        parts = urlsplit(url)
+        if parts.scheme in ['http', 'https', ''] and parts.hostname and parts.hostname != action_host:
+            if parts.hostname not in hosts:
+                hosts.append(parts.hostname)
+    return hosts
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from form_filler.form_parser import describe_fields, load_form_soup, third_party_hosts
+
+# Compiled plans are cached here, one JSON file per (form, config) pair.
+PLAN_CACHE_DIR = '.form_plans'
+
+# Selenium's By.* constants are just these strings; resolving them here keeps
+# the plan free of any selenium import.
+LOCATOR_STRATEGIES = {
+    'id': 'id',
+    'name': 'name',
+    'xpath': 'xpath',
+    'link_text': 'link text',
+    'partial_link_text': 'partial link text',
+    'tag_name': 'tag name',
+    'class_name': 'class name',
+    'css_selector': 'css selector',
+}
+
+
+# Bump when the plan layout changes so stale cache entries are not reused.
+PLAN_FORMAT_VERSION = 3
+
+# Written into fields whose data is missing, so required fields are never left empty.
+PLACEHOLDER = "N/A"
+
+# URL patterns (Chrome's '*' wildcards) for each kind of resource a browser can be told not to load.
+RESOURCE_PATTERNS = {
+    'styles': ['*.css', '*.css?*'],
+    'images': ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.svg', '*.webp', '*.ico'],
+    'fonts': ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot'],
+}
+RESOURCE_KINDS = ('third-party', *RESOURCE_PATTERNS)
+
+
+def fill_values_for_row(config: Dict[str, Any], data_row: Dict[str, Any]) -> Dict[str, Tuple[str, Any]]:
+    """Maps each data key to (form field name, value to fill) for one row."""
+    # Rows from the pre-flight check already carry their normalized values.
+    checked = getattr(data_row, 'fill_values', None)
+    if checked is not None:
+        return checked
+
+    field_values = {}
+    for data_key, form_field_name in config['field_mappings'].items():
+        # Get the value from the data row, or use None if the key doesn't exist.
+        value = data_row.get(data_key)
+
+        # If the value is None or an empty string, use a placeholder.
+        # Otherwise, use the actual value.
+        if value is None or str(value).strip() == "":
+            fill_value = PLACEHOLDER
+            print(f"Info: Using placeholder '{fill_value}' for empty field '{data_key}'.")
+        else:
+            fill_value = value
+        field_values[data_key] = (form_field_name, fill_value)
+    return field_values
+
+
+def plan_key(config: Dict[str, Any]) -> str:
+    """Hash of the form file contents and the mapping config."""
+    digest = hashlib.sha256(f"plan-v{PLAN_FORMAT_VERSION}".encode('utf-8'))
+    with open(config['form_url'], 'rb') as f:
+        digest.update(f.read())
+    digest.update(json.dumps(config, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def resolve_locator(locator: Dict[str, str]) -> Dict[str, str]:
+    """Turns a config locator like {"type": "css_selector", ...} into a WebDriver strategy."""
+    strategy = LOCATOR_STRATEGIES.get(locator['type'].lower())
+    if strategy is None:
+        raise ValueError(f"Unknown locator type '{locator['type']}'. Expected one of: {', '.join(LOCATOR_STRATEGIES)}")
+    return {'by': strategy, 'value': locator['value']}
+
+
+def build_form_plan(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Compiles a mapping config against its HTML form into an execution plan."""
+    soup = load_form_soup(config['form_url'])
+    form_fields = describe_fields(soup)
+
+    fields = {}
+    for data_key, form_field_name in config['field_mappings'].items():
+        described = form_fields.get(form_field_name)
+        fields[data_key] = {
+            'name': form_field_name,
+            # 'unknown' fields are left to the filler to inspect in the live DOM.
+            'kind': described['kind'] if described else 'unknown',
+            'options': described['options'] if described else None,
+            'required': described['required'] if described else False,
+            'value': described['value'] if described else None,
+        }
+
+    return {
+        'form_url': config['form_url'],
+        'fields': fields,
+        'submit': resolve_locator(config['submit_button']),
+        'third_party_hosts': third_party_hosts(soup),
+    }
+
+
+def blocked_url_patterns(plan: Dict[str, Any], kinds: List[str]) -> List[str]:
+    """The URL patterns to block for the given resource kinds (see RESOURCE_KINDS)."""
+    patterns = []
+    for kind in kinds:
+        if kind == 'third-party':
+            patterns.extend(f"*://{host}/*" for host in plan.get('third_party_hosts', []))
+        elif kind in RESOURCE_PATTERNS:
+            patterns.extend(RESOURCE_PATTERNS[kind])
+        else:
+            raise ValueError(f"Unknown resource kind '{kind}'. Expected one of: {', '.join(RESOURCE_KINDS)}")
+    return patterns
+
+
+def compile_form_plan(config: Dict[str, Any], cache_dir: str = PLAN_CACHE_DIR) -> Dict[str, Any]:
+    """
+    Returns the execution plan for a config, reading it from the on-disk cache
+    when the form file and config are unchanged since it was last compiled.
+    """
+    key = plan_key(config)
+    cache_file = Path(cache_dir) / f"{key}.json"
+    if cache_file.exists():
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass  # A corrupt cache entry is simply rebuilt.
+
+    plan = build_form_plan(config)
+    plan['key'] = key
+
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a temporary file first so parallel workers never read half a plan.
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(plan, f, indent=2)
+    os.replace(tmp_file, cache_file)
+    return plan
@@ -0,0 +1,126 @@
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urljoin, urlsplit, urlunsplit
+
+import urllib3
+
+from form_filler.form_parser import describe_form, load_form_soup
+from form_filler.form_plan import compile_form_plan, fill_values_for_row
+from form_filler.verification import SuccessCondition
+from form_filler.metrics import PhaseTimer
+
+
+def make_http_pool(workers: int = 1) -> urllib3.PoolManager:
+    """A connection pool big enough for every worker to keep its own connection alive."""
+    return urllib3.PoolManager(maxsize=max(1, workers), block=False)
+
+
+class HttpFormFiller:
+    """
+    Submits plain HTML forms (no JavaScript) straight over HTTP instead of
+    driving a browser. It has the same interface as FormFiller, so it can be
+    used anywhere FormFiller is, including in a FillerPool.
+
+    The form file named by 'form_url' is read locally to learn the action,
+    method and encoding; requests go to that same path under base_url.
+    """
+    def __init__(self, config: Dict[str, Any], base_url: str, http: Optional[urllib3.PoolManager] = None,
+                 timeout: float = 10.0):
+        self.config = config
+        self.plan = compile_form_plan(config)
+        self.form = describe_form(load_form_soup(config['form_url']), config.get('submit_button'))
+        self.success_condition = SuccessCondition(config.get('success_condition'))
+        self.timeout = timeout
+
+        form_path = config['form_url'].replace('\\', '/')
+        self.page_url = urljoin(base_url.rstrip('/') + '/', form_path)
+        self.action_url = urljoin(self.page_url, self.form['action'] or self.page_url)
+
+        # Share one pool across fillers so connections are reused between workers.
+        self._owns_http = http is None
+        self.http = http or make_http_pool()
+
+    def _build_fields(self, data_row: Dict[str, Any]) -> Tuple[Optional[List[Tuple[str, str]]], Optional[str]]:
+        """Returns the (name, value) pairs to submit, or an error message if a value is not allowed."""
+        field_values = fill_values_for_row(self.config, data_row)
+        mapped_names = {form_field_name for form_field_name, _ in field_values.values()}
+        # Start from what an untouched form would send, minus the fields we are about to set.
+        fields = [(name, value) for name, value in self.form['defaults'] if name not in mapped_names]
+
+        for data_key, (form_field_name, fill_value) in field_values.items():
+            field = self.plan['fields'][data_key]
+            kind, options = field['kind'], field['options']
+            if kind == 'unknown':
+                return None, f"Error: Could not find element with name='{form_field_name}'"
+            if kind == 'checkbox':
+                if fill_value:
+                    fields.append((form_field_name, field['value'] or 'on'))
+                continue
+            if options is not None and str(fill_value) not in options:
+                return None, f"Value '{fill_value}' is not one of the options for '{form_field_name}': {options}"
+            fields.append((form_field_name, str(fill_value)))
+
+        if self.form['submit_field']:
+            fields.append(self.form['submit_field'])
+        return fields, None
+
+    def _send(self, fields: List[Tuple[str, str]]):
+        method = self.form['method']
+        if method == 'GET':
+            # Browsers replace the action's query string with the form data.
+            scheme, netloc, path, _, _ = urlsplit(self.action_url)
+            url = urlunsplit((scheme, netloc, path, urlencode(fields), ''))
+            return self.http.request('GET', url, timeout=self.timeout, redirect=True)
+        return self.http.request(
+            method,
+            self.action_url,
+            fields=fields,
+            encode_multipart=self.form['enctype'] == 'multipart/form-data',
+            timeout=self.timeout,
+            redirect=True,
+        )
+
+    def fill_form_for_row(self, data_row: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Submits the form for one row. The result includes the row's latency
+        and a per-phase breakdown ('timings') in seconds.
+        """
+        started = time.monotonic()
+        timer = PhaseTimer()
+        result = self._submit(data_row, timer)
+        result['latency'] = round(time.monotonic() - started, 3)
+        result['timings'] = timer.rounded()
+        return result
+
+    def _submit(self, data_row: Dict[str, Any], timer: PhaseTimer) -> Dict[str, Any]:
+        with timer.phase('fill'):
+            fields, error = self._build_fields(data_row)
+        if error:
+            return {'status': 'FAILED', 'reason': error, 'data': data_row}
+
+        try:
+            with timer.phase('submit'):
+                response = self._send(fields)
+        except urllib3.exceptions.HTTPError as e:
+            return {'status': 'FAILED', 'reason': f'An HTTP error occurred: {e.__class__.__name__}', 'data': data_row}
+
+        if response.status >= 400:
+            return {'status': 'FAILED', 'reason': f'The server answered with HTTP {response.status}.', 'data': data_row}
+
+        # urllib3 2.x exposes the post-redirect URL as .url, 1.26 only through geturl(); either may be a bare path.
+        final_url = urljoin(self.action_url, getattr(response, 'url', None) or response.geturl() or '')
+        with timer.phase('verify'):
+            html = response.data.decode('utf-8', errors='replace')
+            verified = self.success_condition.check_response(final_url, html)
+        if verified:
+            return {'status': 'SUCCESS', 'reason': 'Form submitted successfully.', 'data': data_row}
+        return {
+            'status': 'FAILED',
+            'reason': f"Success condition ({self.success_condition.describe()}) not met by the response.",
+            'data': data_row
+        }
+
+    def close(self):
+        """Releases the connection pool if this filler created it."""
+        if self._owns_http:
+            self.http.clear()
@@ -0,0 +1,68 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Set
+
+
+def row_hash(row: Dict[str, Any]) -> str:
+    """Stable identity of a data row, independent of key order."""
+    encoded = json.dumps(row, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class Journal:
+    """
+    Append-only record of every finished row, one JSON object per line.
+    Each line is flushed and fsync'd before the next row starts, so a crash
+    loses at most the row that was in flight.
+    """
+    def __init__(self, path: str, resume: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # A fresh run starts a fresh journal; a resumed run keeps adding to the old one.
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+
+    def record(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Durably appends the result of one row, and returns the entry written."""
+        entry = {
+            'row_hash': row_hash(result['data']),
+            # When the row finished, not when it got here: results are handed over in row order.
+            'timestamp': result.get('finished_at') or datetime.now().isoformat(),
+            'status': result['status'],
+            'reason': result['reason'],
+            'latency': result.get('latency'),
+            'timings': result.get('timings') or {},
+            'retries': result.get('retries', 0),
+            'browser_restarts': result.get('browser_restarts', 0),
+            'browser_memory_mb': result.get('browser_memory_mb'),
+            'worker': result.get('worker'),
+            'data': result['data'],
+        }
+        self._file.write(json.dumps(entry, default=str, ensure_ascii=False) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return entry
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+def iter_entries(path: str) -> Iterator[Dict[str, Any]]:
+    """Reads journal entries one at a time, ignoring a torn last line left by a crash."""
+    journal_path = Path(path)
+    if not journal_path.exists():
+        return
+    with open(journal_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def completed_hashes(path: str) -> Set[str]:
+    """Hashes of all rows the journal records as successfully submitted."""
+    return {entry['row_hash'] for entry in iter_entries(path) if entry.get('status') == 'SUCCESS'}
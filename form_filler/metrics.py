@@ -0,0 +1,193 @@
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# The phases of a row, in the order they happen.
+PHASES = ('pacing', 'navigate', 'locate', 'fill', 'submit', 'verify')
+
+# Latency samples kept per phase; percentiles over a long run come from a random sample of this size.
+SAMPLE_SIZE = 10000
+
+
+class PhaseTimer:
+    """
+    Measures how long each phase of one row takes, using the monotonic clock.
+    Phases may nest; time spent in an inner phase is not counted again in the
+    outer one, so e.g. element lookups during 'fill' only show up as 'locate'.
+    """
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._stack: List[List[float]] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        frame = [time.monotonic(), 0.0]  # [start, time spent in nested phases]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.monotonic() - frame[0]
+            self.add(name, elapsed - frame[1])
+            if self._stack:
+                self._stack[-1][1] += elapsed
+
+    def add(self, name: str, seconds: float):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def rounded(self) -> Dict[str, float]:
+        return {name: round(seconds, 4) for name, seconds in self.timings.items()}
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+class RunMetrics:
+    """
+    Aggregates the per-row timings of a run into per-phase percentiles and
+    throughput. With a metrics file it rewrites that file every few seconds,
+    as JSON or, for .prom/.txt files, in the Prometheus text format.
+    """
+    def __init__(self, metrics_file: Optional[str] = None, flush_interval: float = 5.0):
+        self.metrics_file = Path(metrics_file) if metrics_file else None
+        self.flush_interval = flush_interval
+        self.started = time.monotonic()
+        self.rows = 0
+        self.statuses: Dict[str, int] = {}
+        self.retries = 0
+        self.browser_restarts = 0
+        self.peak_browser_memory_mb = None
+        self._samples: Dict[str, List[float]] = {}
+        self._seen: Dict[str, int] = {}
+        self._last_flush = self.started
+        self._lock = threading.Lock()
+
+    def _sample(self, name: str, seconds: float):
+        # Reservoir sampling keeps memory flat however long the run is.
+        samples = self._samples.setdefault(name, [])
+        seen = self._seen.get(name, 0) + 1
+        self._seen[name] = seen
+        if len(samples) < SAMPLE_SIZE:
+            samples.append(seconds)
+        else:
+            slot = random.randrange(seen)
+            if slot < SAMPLE_SIZE:
+                samples[slot] = seconds
+
+    def observe(self, result: Dict[str, Any]):
+        """Adds one finished row, then refreshes the metrics file if it is due."""
+        with self._lock:
+            self.rows += 1
+            self.statuses[result['status']] = self.statuses.get(result['status'], 0) + 1
+            for name, seconds in (result.get('timings') or {}).items():
+                self._sample(name, seconds)
+            if result.get('latency') is not None:
+                self._sample('total', result['latency'])
+            self.retries += result.get('retries') or 0
+            self.browser_restarts += result.get('browser_restarts') or 0
+            memory = result.get('browser_memory_mb')
+            if memory is not None:
+                self._sample('browser_memory_mb', memory)
+                self.peak_browser_memory_mb = max(memory, self.peak_browser_memory_mb or 0)
+        if self.metrics_file and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def rows_per_second(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current totals and p50/p95/p99 per phase, in seconds."""
+        with self._lock:
+            phases = {}
+            for name in [*PHASES, 'total']:
+                values = sorted(self._samples.get(name, []))
+                if values:
+                    phases[name] = {
+                        'p50': percentile(values, 0.50),
+                        'p95': percentile(values, 0.95),
+                        'p99': percentile(values, 0.99),
+                        'count': self._seen[name],
+                    }
+            memory = sorted(self._samples.get('browser_memory_mb', []))
+            return {
+                'rows': self.rows,
+                'elapsed_seconds': round(time.monotonic() - self.started, 3),
+                'rows_per_second': round(self.rows_per_second(), 4),
+                'statuses': dict(self.statuses),
+                'phases': phases,
+                'retries': self.retries,
+                'browser_restarts': self.browser_restarts,
+                'browser_memory_mb': {
+                    'p50': percentile(memory, 0.50),
+                    'p95': percentile(memory, 0.95),
+                    'peak': self.peak_browser_memory_mb,
+                } if memory else None,
+            }
+
+    def summary_lines(self) -> List[str]:
+        snapshot = self.snapshot()
+        lines = [f"{snapshot['rows']} rows in {snapshot['elapsed_seconds']:.1f}s ({snapshot['rows_per_second']:.2f} rows/s)"]
+        for name, stats in snapshot['phases'].items():
+            lines.append(f"  {name:<9} p50 {stats['p50']:.3f}s  p95 {stats['p95']:.3f}s  p99 {stats['p99']:.3f}s")
+        if snapshot['retries'] or snapshot['browser_restarts']:
+            lines.append(f"{snapshot['browser_restarts']} browser restarts, {snapshot['retries']} row retries")
+        memory = snapshot['browser_memory_mb']
+        if memory:
+            lines.append(f"Browser memory: p50 {memory['p50']:.0f} MB  p95 {memory['p95']:.0f} MB  peak {memory['peak']:.0f} MB")
+        return lines
+
+    def _prometheus_text(self, snapshot: Dict[str, Any]) -> str:
+        lines = [
+            "# TYPE formfiller_rows_total counter",
+            f"formfiller_rows_total {snapshot['rows']}",
+            "# TYPE formfiller_rows_per_second gauge",
+            f"formfiller_rows_per_second {snapshot['rows_per_second']}",
+            "# TYPE formfiller_rows_by_status counter",
+        ]
+        for status, count in snapshot['statuses'].items():
+            lines.append(f'formfiller_rows_by_status{{status="{status}"}} {count}')
+        lines.append("# TYPE formfiller_phase_seconds summary")
+        for name, stats in snapshot['phases'].items():
+            for key, quantile in [('p50', '0.5'), ('p95', '0.95'), ('p99', '0.99')]:
+                lines.append(f'formfiller_phase_seconds{{phase="{name}",quantile="{quantile}"}} {stats[key]}')
+            lines.append(f'formfiller_phase_seconds_count{{phase="{name}"}} {stats["count"]}')
+        lines.extend([
+            "# TYPE formfiller_retries_total counter",
+            f"formfiller_retries_total {snapshot['retries']}",
+            "# TYPE formfiller_browser_restarts_total counter",
+            f"formfiller_browser_restarts_total {snapshot['browser_restarts']}",
+        ])
+        memory = snapshot['browser_memory_mb']
+        if memory:
+            lines.append("# TYPE formfiller_browser_memory_mb gauge")
+            for key in ['p50', 'p95', 'peak']:
+                lines.append(f'formfiller_browser_memory_mb{{stat="{key}"}} {memory[key]}')
+        return "\n".join(lines) + "\n"
+
+    def flush(self):
+        """Rewrites the metrics file atomically, so readers never see half of it."""
+        if not self.metrics_file:
+            return
+        self._last_flush = time.monotonic()
+        snapshot = self.snapshot()
+        if self.metrics_file.suffix.lower() in ['.prom', '.txt']:
+            content = self._prometheus_text(snapshot)
+        else:
+            content = json.dumps(snapshot, indent=2)
+
+        self.metrics_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.metrics_file.with_name(self.metrics_file.name + '.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_file, self.metrics_file)
@@ -0,0 +1,188 @@
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from form_filler.rate_limit import RateLimiter, get_shared_limiter
+
+# Marker a worker puts on the results queue once it has stopped for good.
+_DONE = object()
+
+# Seconds run() waits, when stopped early, for workers to finish their row and close their browser.
+CLOSE_TIMEOUT = 60.0
+
+
+class _StartupFailure:
+    """Sent by a worker whose filler (browser) could not be created."""
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+class FillerPool:
+    """
+    Spreads data rows across several fillers, each running on its own thread
+    with its own browser. Results are yielded back in the original row order.
+    """
+    def __init__(self, filler_factory: Callable[[], Any], workers: int = 1, log: Callable[[str], None] = print,
+                 rate_limiter: Optional[RateLimiter] = None):
+        if workers < 1:
+            raise ValueError(f"Number of workers must be at least 1, got {workers}.")
+        self.filler_factory = filler_factory
+        self.workers = workers
+        self.log = log
+        # Pacing is per row and shared by all workers, so adding workers never exceeds the rate.
+        self.rate_limiter = rate_limiter or get_shared_limiter()
+        self._stop = threading.Event()
+
+    def stop(self):
+        """Asks the pool to stop handing out rows. Rows already being filled are finished."""
+        self._stop.set()
+
+    def _put(self, q: queue.Queue, item: Any) -> bool:
+        """Puts an item on a bounded queue without blocking forever once the pool is stopped."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _feed(self, rows: Iterable[Dict[str, Any]], tasks: queue.Queue, results: queue.Queue, state: Dict[str, Any]):
+        """
+        Reads the rows lazily and hands them to the workers. Rows the
+        pre-flight check rejected are reported straight away instead.
+        """
+        try:
+            for index, row in enumerate(rows):
+                if self._stop.is_set():
+                    break
+                reason = getattr(row, 'reason', None)
+                if reason:
+                    results.put((index, {
+                        'status': 'INVALID', 'reason': reason, 'data': row, 'latency': 0.0, 'timings': {},
+                        'finished_at': datetime.now().isoformat(),
+                    }))
+                    continue
+                if not self._put(tasks, (index, row)):
+                    break
+        except Exception as e:
+            state['feed_error'] = e
+            self._stop.set()
+        finally:
+            # Every worker must get its sentinel, or it waits for rows forever.
+            sent = 0
+            while sent < self.workers and self._put(tasks, _DONE):
+                sent += 1
+            if sent < self.workers:
+                # Stopped: queued rows will not be filled anyway, so drop them to make room.
+                # Only this thread puts on the queue, so the room cannot be taken back.
+                while True:
+                    try:
+                        if tasks.get_nowait() is _DONE:
+                            sent -= 1
+                    except queue.Empty:
+                        break
+                for _ in range(self.workers - sent):
+                    tasks.put_nowait(_DONE)
+
+    def _work(self, worker_id: int, tasks: queue.Queue, results: queue.Queue):
+        """Owns one filler for its whole life and fills whatever rows it is given."""
+        try:
+            filler = self.filler_factory()
+        except Exception as e:
+            self.log(f"[worker {worker_id}] Could not start: {e}")
+            results.put(_StartupFailure(e))
+            results.put(_DONE)
+            return
+
+        self.log(f"[worker {worker_id}] Ready.")
+        try:
+            while True:
+                task = tasks.get()
+                if task is _DONE:
+                    break
+                if self._stop.is_set():
+                    # Keep draining so the feeder never blocks, but fill nothing more.
+                    continue
+
+                index, row = task
+                self.log(f"[worker {worker_id}] Processing row {index + 1} for: {row.get('full_name', 'N/A')}")
+                waited = self.rate_limiter.acquire()
+                try:
+                    result = filler.fill_form_for_row(row)
+                except Exception as e:
+                    # A crash on one row must not take the other workers down with it.
+                    result = {'status': 'CRASHED', 'reason': f"Worker {worker_id} crashed on this row: {e}", 'data': row}
+                result['finished_at'] = datetime.now().isoformat()
+                result['worker'] = worker_id
+                result.setdefault('timings', {})['pacing'] = round(waited, 4)
+                results.put((index, result))
+        finally:
+            try:
+                filler.close()
+            except Exception as e:
+                self.log(f"[worker {worker_id}] Error while closing: {e}")
+            results.put(_DONE)
+
+    def run(self, rows: Iterable[Dict[str, Any]]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Fills every row and yields (row_index, result) pairs in input order.
+        Raises the startup error if not a single worker could be started.
+        """
+        self._stop.clear()
+        tasks = queue.Queue(maxsize=self.workers * 2)
+        results = queue.Queue()
+        state = {'feed_error': None}
+
+        threads = [threading.Thread(target=self._feed, args=(rows, tasks, results, state), daemon=True)]
+        for worker_id in range(1, self.workers + 1):
+            threads.append(threading.Thread(target=self._work, args=(worker_id, tasks, results), daemon=True))
+        for thread in threads:
+            thread.start()
+
+        pending = {}
+        next_index = 0
+        finished = 0
+        startup_errors = []
+        try:
+            while finished < self.workers:
+                item = results.get()
+                if item is _DONE:
+                    finished += 1
+                    continue
+                if isinstance(item, _StartupFailure):
+                    startup_errors.append(item.error)
+                    if len(startup_errors) == self.workers:
+                        self._stop.set()
+                    continue
+
+                index, result = item
+                pending[index] = result
+                # Hold back out-of-order results until every earlier row is done.
+                while next_index in pending:
+                    yield next_index, pending.pop(next_index)
+                    next_index += 1
+
+            # After a stop some earlier rows were never filled; still hand back what finished.
+            for index in sorted(pending):
+                yield index, pending.pop(index)
+        finally:
+            self._stop.set()
+            # When the caller stops early (Ctrl+C, an error, closing the generator), wait for the
+            # workers to close their fillers, or their browsers outlive the process.
+            deadline = time.monotonic() + CLOSE_TIMEOUT
+            while finished < self.workers:
+                try:
+                    item = results.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    self.log(f"Gave up waiting for {self.workers - finished} worker(s) to close after {CLOSE_TIMEOUT:g}s.")
+                    break
+                if item is _DONE:
+                    finished += 1
+
+        if len(startup_errors) == self.workers:
+            raise startup_errors[0]
+        if state['feed_error'] is not None:
+            raise state['feed_error']
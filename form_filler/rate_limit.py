@@ -0,0 +1,100 @@
+import argparse
+import random
+import threading
+import time
+from typing import Optional
+
+_UNITS = {'s': 1.0, 'sec': 1.0, 'second': 1.0, 'm': 60.0, 'min': 60.0, 'minute': 60.0, 'h': 3600.0, 'hour': 3600.0}
+
+
+def parse_rate(text: str) -> Optional[float]:
+    """
+    Parses a rate like '2/s', '120/min' or '0.5' (per second) into submissions
+    per second. An empty string means no limit and returns None.
+    """
+    text = (text or '').strip().lower()
+    if not text:
+        return None
+    amount, _, unit = text.partition('/')
+    unit = unit.strip() or 's'
+    if unit not in _UNITS:
+        raise argparse.ArgumentTypeError(f"Unknown rate unit '{unit}' in '{text}'. Use something like '2/s' or '120/min'.")
+    try:
+        rate = float(amount) / _UNITS[unit]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid rate '{text}'. Use something like '2/s' or '120/min'.")
+    if not rate > 0:
+        raise argparse.ArgumentTypeError(f"Rate must be positive, got '{text}'.")
+    return rate
+
+
+class RateLimiter:
+    """
+    Token bucket that paces form submissions. One limiter is shared by all
+    fillers in a process, so the configured rate holds no matter how many
+    workers are running. 'burst' rows may start back to back before pacing
+    kicks in, and each row waits an extra random 0..'jitter' seconds.
+    """
+    def __init__(self, rate: Optional[float] = None, burst: int = 1, jitter: float = 0.0):
+        if burst < 1:
+            raise ValueError(f"Burst size must be at least 1, got {burst}.")
+        self.rate = rate
+        self.burst = burst
+        self.jitter = jitter
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self._started = None
+        self._acquired = 0
+
+    def acquire(self) -> float:
+        """Blocks until the next row may start. Returns the number of seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            if self._started is None:
+                self._started = now
+            self._acquired += 1
+
+            wait = 0.0
+            if self.rate is not None:
+                self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+                self._last_refill = now
+                # Going below zero reserves a future slot, so concurrent callers queue up fairly.
+                self._tokens -= 1
+                if self._tokens < 0:
+                    wait = -self._tokens / self.rate
+
+        if self.jitter:
+            wait += random.uniform(0, self.jitter)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def achieved_rate(self) -> float:
+        """Rows actually started per second since the first one."""
+        with self._lock:
+            if self._started is None:
+                return 0.0
+            elapsed = time.monotonic() - self._started
+            return self._acquired / elapsed if elapsed > 0 else 0.0
+
+    def describe(self) -> str:
+        target = f"{self.rate:.2f}/s" if self.rate is not None else "unlimited"
+        return f"target {target}, achieved {self.achieved_rate():.2f}/s (burst {self.burst}, jitter {self.jitter:g}s)"
+
+
+_shared_limiter = RateLimiter()
+_shared_lock = threading.Lock()
+
+
+def configure_shared_limiter(rate: Optional[float] = None, burst: int = 1, jitter: float = 0.0) -> RateLimiter:
+    """Replaces the process-wide limiter and returns it."""
+    global _shared_limiter
+    with _shared_lock:
+        _shared_limiter = RateLimiter(rate, burst=burst, jitter=jitter)
+        return _shared_limiter
+
+
+def get_shared_limiter() -> RateLimiter:
+    """The limiter every filler in this process should pace itself with."""
+    return _shared_limiter
@@ -0,0 +1,389 @@
+import csv
+import json
+import queue
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from form_filler.journal import iter_entries, row_hash
+from form_filler.metrics import PHASES
+
+# Parquet reports need pyarrow; CSV and JSONL reports work without it.
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+REPORT_FORMATS = ('csv', 'jsonl', 'parquet')
+
+# Columns every report starts with; the row's own fields follow as 'data.<field>' columns.
+RESULT_COLUMNS = (
+    'finished_at', 'status', 'reason', 'latency_seconds', *(f"{phase}_seconds" for phase in PHASES),
+    'retries', 'browser_restarts', 'browser_memory_mb', 'worker', 'row_hash',
+)
+
+# Finished rows waiting for the writer thread; a slow disk makes the fill loop wait rather than grow memory.
+QUEUE_SIZE = 10000
+# Rows written (and flushed) at a time, and rows per Parquet row group.
+BATCH_ROWS = 1000
+ROW_GROUP_ROWS = 50000
+
+_CLOSE = object()
+
+
+def report_record(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Flattens a journal entry into one report row, with a column per data field."""
+    timings = entry.get('timings') or {}
+    record = {
+        'finished_at': entry.get('timestamp'),
+        'status': entry['status'],
+        'reason': entry['reason'],
+        'latency_seconds': entry.get('latency'),
+        **{f"{phase}_seconds": timings.get(phase) for phase in PHASES},
+        'retries': entry.get('retries', 0),
+        'browser_restarts': entry.get('browser_restarts', 0),
+        'browser_memory_mb': entry.get('browser_memory_mb'),
+        'worker': entry.get('worker'),
+        'row_hash': entry.get('row_hash'),
+    }
+    for key, value in (entry.get('data') or {}).items():
+        record[f"data.{key}"] = value
+    return record
+
+
+def report_entry(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Turns a report row back into a journal entry; the reverse of report_record()."""
+    def number(column: str, kind=float):
+        value = record.get(column)
+        return None if value is None or value == '' else kind(value)
+
+    finished = record.get('finished_at')
+    data = {column[len('data.'):]: value for column, value in record.items() if column.startswith('data.')}
+    return {
+        'row_hash': record.get('row_hash') or row_hash(data),
+        'timestamp': finished.isoformat() if isinstance(finished, datetime) else finished or None,
+        'status': record['status'],
+        'reason': record['reason'],
+        'latency': number('latency_seconds'),
+        'timings': {phase: number(f"{phase}_seconds") for phase in PHASES if number(f"{phase}_seconds") is not None},
+        'retries': number('retries', int) or 0,
+        'browser_restarts': number('browser_restarts', int) or 0,
+        'browser_memory_mb': number('browser_memory_mb'),
+        'worker': number('worker', int),
+        'data': data,
+    }
+
+
+class _CsvSink:
+    def __init__(self, path: Path, columns: List[str]):
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=columns, extrasaction='ignore')
+        self._writer.writeheader()
+
+    def write(self, records: List[Dict[str, Any]]):
+        self._writer.writerows(records)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class _JsonlSink:
+    def __init__(self, path: Path, columns: List[str]):
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, records: List[Dict[str, Any]]):
+        self._file.write(''.join(json.dumps(record, default=str, ensure_ascii=False) + '\n' for record in records))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetSink:
+    def __init__(self, path: Path, columns: List[str]):
+        types = {
+            'finished_at': pa.timestamp('us'),
+            'latency_seconds': pa.float64(),
+            'retries': pa.int64(),
+            'browser_restarts': pa.int64(),
+            'browser_memory_mb': pa.float64(),
+            'worker': pa.int64(),
+            **{f"{phase}_seconds": pa.float64() for phase in PHASES},
+        }
+        # Data fields are stored as text: a column's type must not change between row groups.
+        self._schema = pa.schema([(column, types.get(column, pa.string())) for column in columns])
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._pending: List[Dict[str, Any]] = []
+
+    def _column(self, name: str) -> List[Any]:
+        values = [record.get(name) for record in self._pending]
+        if name == 'finished_at':
+            return [datetime.fromisoformat(value) if value else None for value in values]
+        if name.startswith('data.'):
+            return [None if value is None else str(value) for value in values]
+        return values
+
+    def _flush(self):
+        if self._pending:
+            table = pa.table({name: self._column(name) for name in self._schema.names}, schema=self._schema)
+            self._writer.write_table(table)
+            self._pending = []
+
+    def write(self, records: List[Dict[str, Any]]):
+        # Rows are buffered into large row groups, which is what makes the file fast to scan.
+        self._pending.extend(records)
+        if len(self._pending) >= ROW_GROUP_ROWS:
+            self._flush()
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+_SINKS = {'csv': _CsvSink, 'jsonl': _JsonlSink, 'parquet': _ParquetSink}
+
+
+class ReportWriter:
+    """
+    Streams finished rows into a CSV, JSONL or Parquet report on a background
+    thread, so the fill loop only pays for putting the row on a queue. Each row
+    has its completion time, timings and data fields as separate columns. On
+    close, a summary file with the counts per status and reason is written
+    next to the report.
+
+    The data columns are data_columns (e.g. the mapped fields) followed by
+    the other fields of the first row, which for CSV and Excel sources is the
+    file's header. CSV and Parquet reports cannot add columns later, so fields
+    that only appear in later rows are left out and counted in the summary;
+    JSONL reports keep every field.
+    """
+    def __init__(self, path: str, fmt: Optional[str] = None, data_columns: Optional[List[str]] = None):
+        self.path = Path(path)
+        self.format = (fmt or self.path.suffix.lstrip('.')).lower()
+        if self.format not in REPORT_FORMATS:
+            raise ValueError(f"Unsupported report format '{self.format}'. Expected one of: {', '.join(REPORT_FORMATS)}")
+        if self.format == 'parquet' and pa is None:
+            raise ValueError("Parquet reports need pyarrow. Install it with: pip install pyarrow")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.summary_path = self.path.with_name(f"{self.path.stem}_summary.json")
+        self.data_columns = list(data_columns or [])
+
+        self.rows = 0
+        self.by_status: Counter = Counter()
+        self.by_reason: Counter = Counter()
+        self.first_finished = None
+        self.last_finished = None
+        self.left_out: Counter = Counter()
+        self._error = None
+        self._queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, entry: Dict[str, Any]):
+        """Queues a journal entry for the report."""
+        self._queue.put(entry)
+
+    def _count(self, record: Dict[str, Any]):
+        self.rows += 1
+        self.by_status[record['status']] += 1
+        self.by_reason[(record['status'], record['reason'])] += 1
+        finished = record['finished_at']
+        if finished:
+            # ISO timestamps sort as text.
+            self.first_finished = min(self.first_finished or finished, finished)
+            self.last_finished = max(self.last_finished or finished, finished)
+
+    def _columns(self, first: Dict[str, Any]) -> List[str]:
+        columns = list(RESULT_COLUMNS) + [f"data.{name}" for name in self.data_columns]
+        return columns + [column for column in first if column not in columns]
+
+    def _run(self):
+        sink = None
+        columns = set()
+        closing = False
+        while not closing:
+            batch = [self._queue.get()]
+            while len(batch) < BATCH_ROWS:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is _CLOSE:
+                batch.pop()
+                closing = True
+            if self._error:
+                continue  # Keep draining so the fill loop never blocks on a dead writer.
+            try:
+                records = [report_record(entry) for entry in batch]
+                for record in records:
+                    self._count(record)
+                if sink is None and records:
+                    header = self._columns(records[0])
+                    sink = _SINKS[self.format](self.path, header)
+                    columns = set(header)
+                if self.format != 'jsonl':
+                    for record in records:
+                        self.left_out.update(column for column in record if column not in columns)
+                if records:
+                    sink.write(records)
+            except Exception as e:
+                self._error = e
+        try:
+            if sink is None and not self._error:
+                sink = _SINKS[self.format](self.path, self._columns({}))
+            if sink is not None:
+                sink.close()
+        except Exception as e:
+            self._error = self._error or e
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'report': str(self.path),
+            'rows': self.rows,
+            'first_finished_at': self.first_finished,
+            'last_finished_at': self.last_finished,
+            'by_status': dict(self.by_status.most_common()),
+            'by_reason': [
+                {'status': status, 'reason': reason, 'count': count}
+                for (status, reason), count in self.by_reason.most_common()
+            ],
+            # Fields some rows had that are not among the report's columns, with how many rows had them.
+            'columns_left_out': dict(self.left_out.most_common()),
+        }
+
+    def summary_lines(self, reasons: int = 5) -> List[str]:
+        """Counts per status, then the most common reasons rows did not succeed."""
+        statuses = ', '.join(f"{status}: {count}" for status, count in self.by_status.most_common())
+        lines = [f"Report: {self.rows} rows ({statuses or 'none'})"]
+        failures = [(key, count) for key, count in self.by_reason.most_common() if key[0] != 'SUCCESS']
+        for (status, reason), count in failures[:reasons]:
+            lines.append(f"  {count} x {status}: {reason}")
+        if self.left_out:
+            lines.append(
+                f"Warning: fields missing from the first row are not in the {self.format} report "
+                f"(the journal has them): {', '.join(self.left_out)}"
+            )
+        return lines
+
+    def close(self):
+        """Writes the remaining rows and the summary file. Raises if the report could not be written."""
+        if self._thread.is_alive():
+            self._queue.put(_CLOSE)
+            self._thread.join()
+        if self._error:
+            raise OSError(f"Could not write the report {self.path}: {self._error}")
+        with open(self.summary_path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2, ensure_ascii=False)
+
+
+def write_report(journal_path: str, report_file: str, fmt: Optional[str] = None) -> int:
+    """Rebuilds a report (and its summary) from a journal. Returns the number of rows written."""
+    report = ReportWriter(report_file, fmt)
+    try:
+        for entry in iter_entries(journal_path):
+            report.write(entry)
+    finally:
+        report.close()
+    return report.rows
+
+
+def iter_report_entries(path: str) -> Iterator[Dict[str, Any]]:
+    """Reads the entries of a journal, or of a CSV, JSONL or Parquet report, one at a time."""
+    source = Path(path)
+    if not source.exists():
+        raise FileNotFoundError(f"Report or journal not found at: {path}")
+    fmt = source.suffix.lower().lstrip('.')
+    if fmt == 'csv':
+        with open(source, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            if not {'finished_at', 'status', 'row_hash'} <= set(reader.fieldnames or []):
+                raise ValueError(f"{path} is not a report in the current format; merge its journal instead.")
+            for record in reader:
+                yield report_entry(record)
+    elif fmt == 'parquet':
+        if pa is None:
+            raise ValueError("Parquet reports need pyarrow. Install it with: pip install pyarrow")
+        for batch in pq.ParquetFile(source).iter_batches():
+            for record in batch.to_pylist():
+                yield report_entry(record)
+    elif fmt == 'jsonl':
+        for entry in iter_entries(source):
+            # Journals and JSONL reports share the extension; report rows are the flat ones.
+            yield report_entry(entry) if 'finished_at' in entry else entry
+    else:
+        raise ValueError(f"Cannot merge '{path}'. Expected a journal or a report ({', '.join(REPORT_FORMATS)}).")
+
+
+def _outcome(entry: Dict[str, Any]) -> Tuple[bool, str]:
+    # A successful submission beats any failure; otherwise the latest attempt counts.
+    return entry['status'] == 'SUCCESS', entry.get('timestamp') or ''
+
+
+def _rank_entries(inputs: List[str]) -> Tuple[Dict[str, Tuple], Dict[str, None], int]:
+    """
+    First pass over the inputs: the winning entry of each row as (outcome,
+    source, position), every data field in the order first seen, and how
+    many entries were read.
+    """
+    best: Dict[str, Tuple] = {}
+    data_columns: Dict[str, None] = {}
+    read = 0
+    for source, path in enumerate(inputs):
+        for position, entry in enumerate(iter_report_entries(path)):
+            read += 1
+            data_columns.update(dict.fromkeys(entry['data']))
+            key = (*_outcome(entry), source, position)
+            if key > best.get(entry['row_hash'], ()):
+                best[entry['row_hash']] = key
+    return best, data_columns, read
+
+
+def _winning_entries(inputs: List[str], best: Dict[str, Tuple],
+                     keep: Optional[Callable[[str], bool]] = None) -> Iterator[Dict[str, Any]]:
+    for source, path in enumerate(inputs):
+        for position, entry in enumerate(iter_report_entries(path)):
+            if best[entry['row_hash']][2:] == (source, position) and (keep is None or keep(entry['row_hash'])):
+                yield entry
+
+
+def best_entries(inputs: List[str], keep: Optional[Callable[[str], bool]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    One entry per row of the inputs: its successful submission if it had one,
+    else its latest attempt. keep, if given, picks rows by their row_hash.
+    """
+    best, _, _ = _rank_entries(inputs)
+    yield from _winning_entries(inputs, best, keep)
+
+
+def merge_reports(inputs: List[str], output: str, fmt: Optional[str] = None,
+                  journal_output: Optional[str] = None) -> Tuple[int, ReportWriter]:
+    """
+    Combines the journals and reports of several shards or runs into one
+    report with one row per data row: its successful submission if it had
+    one, else its latest attempt. The inputs are read twice, so only the
+    winning position of each row is held in memory. Optionally also writes
+    the merged rows as a journal. Returns the number of entries read and the
+    closed report.
+    """
+    targets = {Path(path).resolve() for path in [output, journal_output] if path}
+    if any(Path(path).resolve() in targets for path in inputs):
+        raise ValueError("The merged report and journal must not overwrite one of the inputs.")
+
+    # Every data field of every input becomes a column, so none is lost.
+    best, data_columns, read = _rank_entries(inputs)
+    report = ReportWriter(output, fmt, data_columns=list(data_columns))
+    journal = open(journal_output, 'w', encoding='utf-8') if journal_output else None
+    try:
+        for entry in _winning_entries(inputs, best):
+            report.write(entry)
+            if journal:
+                journal.write(json.dumps(entry, default=str, ensure_ascii=False) + '\n')
+    finally:
+        if journal:
+            journal.close()
+        report.close()
+    return read, report
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import PurePath
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_INDEX_FILE = 'submission_index.sqlite'
+
+# SQLite limits how many parameters one statement may take.
+LOOKUP_BATCH_SIZE = 500
+
+
+def form_key(form_url: str) -> str:
+    """Normalizes a form path so 'forms\\form1.html' and 'forms/form1.html' match."""
+    return PurePath(form_url.replace('\\', '/')).as_posix()
+
+
+def _normalize_value(value: Any) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        if value != value:  # NaN
+            return ''
+        if value.is_integer():
+            value = int(value)
+    return ' '.join(str(value).split()).casefold()
+
+
+def normalized_row_hash(row: Dict[str, Any], field_mappings: Dict[str, str]) -> str:
+    """
+    Hash of only the values that are actually submitted, normalized for case,
+    whitespace and 28 vs 28.0, so cosmetic differences don't cause resubmission.
+    """
+    values = {key: _normalize_value(row.get(key)) for key in sorted(field_mappings)}
+    return hashlib.sha256(json.dumps(values, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class SubmissionIndex:
+    """
+    Persistent record of every (form, row) pair that was submitted
+    successfully, kept across runs so the same row is never sent twice.
+    """
+    def __init__(self, path: str = DEFAULT_INDEX_FILE):
+        self.path = path
+        # Rows are filtered on the pool's feeder thread while results are recorded on
+        # the main thread, so the connection is shared and guarded by a lock.
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS submissions ("
+            " form_url TEXT NOT NULL,"
+            " row_hash TEXT NOT NULL,"
+            " submitted_at TEXT NOT NULL,"
+            " PRIMARY KEY (form_url, row_hash)"
+            ") WITHOUT ROWID"
+        )
+        self.conn.commit()
+        self.skipped = 0
+
+    def filter_new(self, form_url: str, rows: Iterable[Dict[str, Any]], field_mappings: Dict[str, str],
+                   batch_size: int = LOOKUP_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+        """
+        Yields only the rows not yet submitted to this form. Rows are checked
+        against the index a batch at a time rather than one query per row.
+        Skipped rows are counted in self.skipped.
+        """
+        key = form_key(form_url)
+        batch = []
+        for row in rows:
+            batch.append((normalized_row_hash(row, field_mappings), row))
+            if len(batch) >= batch_size:
+                yield from self._filter_batch(key, batch)
+                batch = []
+        if batch:
+            yield from self._filter_batch(key, batch)
+
+    def _filter_batch(self, key: str, batch: List[Tuple[str, Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+        hashes = [row_hash for row_hash, _ in batch]
+        placeholders = ','.join('?' * len(hashes))
+        with self._lock:
+            found = {
+                found_hash for (found_hash,) in self.conn.execute(
+                    f"SELECT row_hash FROM submissions WHERE form_url = ? AND row_hash IN ({placeholders})",
+                    [key, *hashes]
+                )
+            }
+        for row_hash, row in batch:
+            if row_hash in found:
+                self.skipped += 1
+            else:
+                yield row
+
+    def record(self, form_url: str, row: Dict[str, Any], field_mappings: Dict[str, str]):
+        """Marks a row as successfully submitted to a form."""
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO submissions (form_url, row_hash, submitted_at) VALUES (?, ?, ?)",
+                (form_key(form_url), normalized_row_hash(row, field_mappings), datetime.now().isoformat())
+            )
+            self.conn.commit()
+
+    def list_forms(self) -> List[Tuple[str, int, str]]:
+        """(form_url, number of submitted rows, latest submission) for every form in the index."""
+        return self.conn.execute(
+            "SELECT form_url, COUNT(*), MAX(submitted_at) FROM submissions GROUP BY form_url ORDER BY form_url"
+        ).fetchall()
+
+    def list_entries(self, form_url: str) -> Iterator[Tuple[str, str]]:
+        """(row_hash, submitted_at) for every row submitted to a form."""
+        return self.conn.execute(
+            "SELECT row_hash, submitted_at FROM submissions WHERE form_url = ? ORDER BY submitted_at",
+            (form_key(form_url),)
+        )
+
+    def prune(self, older_than_days: int, form_url: Optional[str] = None) -> int:
+        """Forgets submissions older than the given age. Returns the number of entries removed."""
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).isoformat()
+        if form_url:
+            cursor = self.conn.execute(
+                "DELETE FROM submissions WHERE submitted_at < ? AND form_url = ?", (cutoff, form_key(form_url))
+            )
+        else:
+            cursor = self.conn.execute("DELETE FROM submissions WHERE submitted_at < ?", (cutoff,))
+        self.conn.commit()
+        return cursor.rowcount
+
+    def invalidate(self, form_url: str) -> int:
+        """Forgets every submission to a form, e.g. after the form changed. Returns the number removed."""
+        cursor = self.conn.execute("DELETE FROM submissions WHERE form_url = ?", (form_key(form_url),))
+        self.conn.commit()
+        return cursor.rowcount
+
+    def close(self):
+        self.conn.close()
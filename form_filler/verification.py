@@ -0,0 +1,95 @@
+import re
+from typing import Any, Dict, Optional
+
+CONDITION_TYPES = ('url_contains', 'url_matches', 'element_present', 'text_present')
+
+# What counted as success before this was configurable: landing on success.html.
+DEFAULT_SUCCESS_CONDITION = {
+    'type': 'url_contains',
+    'value': 'success.html',
+    'timeout': 10,
+    'poll_interval': 0.05,
+}
+
+
+class SuccessCondition:
+    """
+    The 'success_condition' block of a mapping config: what the page must show
+    after submitting for the row to count as a success, and how long to wait for it.
+
+        {"type": "url_contains" | "url_matches" | "element_present" | "text_present",
+         "value": "...", "timeout": 10, "poll_interval": 0.05}
+
+    'url_matches' takes a regular expression, 'element_present' a CSS selector.
+    """
+    def __init__(self, spec: Optional[Dict[str, Any]] = None):
+        spec = {**DEFAULT_SUCCESS_CONDITION, **(spec or {})}
+        if spec['type'] not in CONDITION_TYPES:
+            raise ValueError(f"Unknown success condition type '{spec['type']}'. Expected one of: {', '.join(CONDITION_TYPES)}")
+        self.type = spec['type']
+        self.value = spec['value']
+        self.timeout = float(spec['timeout'])
+        self.poll_interval = float(spec['poll_interval'])
+        self._pattern = re.compile(self.value) if self.type == 'url_matches' else None
+
+    def describe(self) -> str:
+        return f"{self.type} '{self.value}'"
+
+    def _is_met(self, driver) -> bool:
+        if self.type == 'url_contains':
+            return self.value in driver.current_url
+        if self.type == 'url_matches':
+            return self._pattern.search(driver.current_url) is not None
+        # Checked with a script rather than find_element so the implicit wait never kicks in.
+        if self.type == 'element_present':
+            return driver.execute_script("return document.querySelector(arguments[0]) !== null;", self.value)
+        return driver.execute_script(
+            "return !!document.body && document.body.innerText.indexOf(arguments[0]) !== -1;", self.value
+        )
+
+    @property
+    def reads_page(self) -> bool:
+        """True when the condition looks at the page's content rather than its URL."""
+        return self.type in ('element_present', 'text_present')
+
+    def is_met(self, driver) -> bool:
+        """Checks the condition once, without waiting."""
+        from selenium.common.exceptions import JavascriptException, StaleElementReferenceException
+
+        try:
+            return bool(self._is_met(driver))
+        except (JavascriptException, StaleElementReferenceException):
+            return False
+
+    def check_response(self, url: str, html: str) -> bool:
+        """Evaluates the same condition against a plain HTTP response instead of a live page."""
+        if self.type == 'url_contains':
+            return self.value in url
+        if self.type == 'url_matches':
+            return self._pattern.search(url) is not None
+
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, 'html.parser')
+        if self.type == 'element_present':
+            return soup.select_one(self.value) is not None
+        body = soup.body or soup
+        return self.value in body.get_text()
+
+    def wait(self, driver) -> bool:
+        """Polls the page until the condition holds. Returns False if the timeout runs out first."""
+        # Imported here so browser-free users (HTTP engine, autodetect) don't load selenium.
+        from selenium.common.exceptions import JavascriptException, StaleElementReferenceException, TimeoutException
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        waiter = WebDriverWait(
+            driver,
+            self.timeout,
+            poll_frequency=self.poll_interval,
+            # The page may be mid-navigation while we poll it.
+            ignored_exceptions=(JavascriptException, StaleElementReferenceException),
+        )
+        try:
+            waiter.until(self._is_met)
+            return True
+        except TimeoutException:
+            return False
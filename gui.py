@@ -3,27 +3,50 @@ from tkinter import ttk, filedialog, messagebox, scrolledtext
 import threading
 import queue
 import os
+import time
+from collections import deque
 from datetime import datetime
+from pathlib import Path
 
 # Import our existing logic
-from form_filler.data_loader import load_data
+from form_filler.data_loader import Preflight, iter_rows
 from form_filler.config_handler import load_mapping_config
+from form_filler.form_plan import compile_form_plan
 from form_filler.filler import FormFiller
+from form_filler.pool import FillerPool
+from form_filler.rate_limit import configure_shared_limiter, parse_rate
+from form_filler.journal import Journal
+from form_filler.reports import ReportWriter
+
+# The log keeps only the most recent lines, so long runs don't slow the window down or grow memory.
+LOG_LIMIT = 5000
+# How often (ms) queued log lines and progress are drawn; everything queued since is drawn at once.
+REFRESH_MS = 200
 
 class App(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("Automated Form Filler")
-        self.geometry("700x550")
+        self.geometry("700x650")
 
         # Variables
         self.data_file_path = tk.StringVar()
         self.config_file_path = tk.StringVar()
         self.headless_mode = tk.BooleanVar(value=False)
         self.disable_delay = tk.BooleanVar(value=False)
+        self.workers = tk.IntVar(value=1)
+        self.bulk_fill = tk.BooleanVar(value=False)
+        self.rate = tk.StringVar(value="")
+        self.pacing_status = tk.StringVar(value="Pacing: idle")
+        self.progress_status = tk.StringVar(value="")
+        self.counters_status = tk.StringVar(value="")
         
         # Queue for thread communication
         self.log_queue = queue.Queue()
+        # Written by the automation thread, drawn by process_log_queue; never touched by both for long.
+        self.progress = None
+        self.cancel_requested = threading.Event()
+        self.pool = None
 
         # Create UI
         self.create_widgets()
@@ -49,13 +72,31 @@ class App(tk.Tk):
         
         ttk.Checkbutton(options_frame, text="Run in Headless Mode (no browser window)", variable=self.headless_mode).pack(anchor="w")
         ttk.Checkbutton(options_frame, text="Disable Random Delays (faster)", variable=self.disable_delay).pack(anchor="w")
+        ttk.Checkbutton(options_frame, text="Bulk Fill (one script call per row, fastest)", variable=self.bulk_fill).pack(anchor="w")
+        
+        workers_frame = ttk.Frame(options_frame)
+        workers_frame.pack(anchor="w", pady=(5, 0))
+        ttk.Label(workers_frame, text="Parallel browsers:").pack(side=tk.LEFT)
+        ttk.Spinbox(workers_frame, from_=1, to=16, width=5, textvariable=self.workers).pack(side=tk.LEFT, padx=5)
+        ttk.Label(workers_frame, text="Max rate (e.g. 2/s, 120/min; empty = unlimited):").pack(side=tk.LEFT, padx=(15, 0))
+        ttk.Entry(workers_frame, width=10, textvariable=self.rate).pack(side=tk.LEFT, padx=5)
         
         # Control Frame
         control_frame = ttk.LabelFrame(main_frame, text="3. Run Automation", padding="10")
         control_frame.pack(fill=tk.X, pady=5)
         
-        self.run_button = ttk.Button(control_frame, text="Start Filling Forms", command=self.start_automation_thread)
-        self.run_button.pack(pady=5)
+        buttons_frame = ttk.Frame(control_frame)
+        buttons_frame.pack(pady=5)
+        self.run_button = ttk.Button(buttons_frame, text="Start Filling Forms", command=self.start_automation_thread)
+        self.run_button.pack(side=tk.LEFT, padx=5)
+        self.cancel_button = ttk.Button(buttons_frame, text="Cancel", command=self.cancel_automation, state="disabled")
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+
+        self.progress_bar = ttk.Progressbar(control_frame, mode="determinate", maximum=100)
+        self.progress_bar.pack(fill=tk.X, pady=(5, 0))
+        ttk.Label(control_frame, textvariable=self.progress_status).pack()
+        ttk.Label(control_frame, textvariable=self.counters_status).pack()
+        ttk.Label(control_frame, textvariable=self.pacing_status).pack()
 
         # Log Frame
         log_frame = ttk.LabelFrame(main_frame, text="Log", padding="10")
@@ -70,16 +111,60 @@ class App(tk.Tk):
         self.log_queue.put(message)
 
     def process_log_queue(self):
-        """Processes messages from the queue and updates the log display."""
+        """
+        Draws everything logged since the last refresh in one insert, trims the
+        log to its last LOG_LIMIT lines, and updates the progress display.
+        """
+        # Lines that would be trimmed straight away are never inserted at all.
+        batch = deque(maxlen=LOG_LIMIT)
         try:
             while True:
-                message = self.log_queue.get_nowait()
-                self.log_text.configure(state='normal')
-                self.log_text.insert(tk.END, message + "\n")
-                self.log_text.see(tk.END)
-                self.log_text.configure(state='disabled')
+                batch.append(self.log_queue.get_nowait())
         except queue.Empty:
-            self.after(100, self.process_log_queue)
+            pass
+
+        if batch:
+            self.log_text.configure(state='normal')
+            self.log_text.insert(tk.END, "\n".join(batch) + "\n")
+            excess = int(self.log_text.index('end-1c').split('.')[0]) - 1 - LOG_LIMIT
+            if excess > 0:
+                self.log_text.delete('1.0', f"{excess + 1}.0")
+            self.log_text.see(tk.END)
+            self.log_text.configure(state='disabled')
+
+        self.update_progress()
+        self.after(REFRESH_MS, self.process_log_queue)
+
+    def update_progress(self):
+        """Shows rows done, rows/s, ETA and the status counters of the current run."""
+        progress = self.progress
+        if progress is None:
+            return
+        done = progress['done']
+        elapsed = time.monotonic() - progress['started']
+        rate = done / elapsed if elapsed > 0 else 0.0
+        total = progress['total']
+
+        text = f"{done} rows"
+        if total:
+            # The count is an estimate, so never show more than 100%.
+            total = max(total, done)
+            self.progress_bar.configure(mode="determinate", value=100 * done / total)
+            text += f" of ~{total}"
+            if rate > 0 and not progress['finished']:
+                remaining = int((total - done) / rate)
+                text += f"  |  ETA {remaining // 3600}:{remaining // 60 % 60:02d}:{remaining % 60:02d}"
+        elif not progress['finished']:
+            self.progress_bar.configure(mode="indeterminate")
+            self.progress_bar.step(5)
+        self.progress_status.set(f"{text}  |  {rate:.2f} rows/s")
+
+        counts = dict(progress['counts'])
+        self.counters_status.set(
+            f"Success: {counts.pop('SUCCESS', 0)}   Failed: {counts.pop('FAILED', 0)}   "
+            f"Invalid: {counts.pop('INVALID', 0)}   Other: {sum(counts.values())}"
+        )
+        self.pacing_status.set(progress['pacing'])
 
     def select_data_file(self):
         path = filedialog.askopenfilename(title="Select Data File", filetypes=[("All data files", "*.csv *.json *.xlsx *.xls"), ("CSV files", "*.csv"), ("JSON files", "*.json"), ("Excel files", "*.xlsx;*.xls")])
@@ -99,45 +184,102 @@ class App(tk.Tk):
             return
             
         self.run_button.config(state="disabled")
+        self.cancel_button.config(state="normal")
+        self.cancel_requested.clear()
         self.log("--- Starting Automation ---")
         
         # Run the core logic in a separate thread to avoid freezing the GUI
         thread = threading.Thread(target=self.run_automation, daemon=True)
         thread.start()
 
+    def cancel_automation(self):
+        """Stops handing out rows. Rows already being filled finish, then the report is written."""
+        self.cancel_requested.set()
+        self.cancel_button.config(state="disabled")
+        self.log("--- Cancelling: finishing the rows in progress ---")
+        if self.pool:
+            self.pool.stop()
+
     def run_automation(self):
         """The core logic that runs in a separate thread."""
-        filler = None
+        journal = None
+        report = None
         try:
-            self.log("Loading data...")
-            data_rows = load_data(self._data_full_path)
-            self.log(f"Loaded {len(data_rows)} rows of data.")
+            self.log("Opening data file...")
+            # Rows are read lazily while the forms are being filled.
+            data_rows = iter_rows(self._data_full_path)
 
             self.log("Loading form configuration...")
             config = load_mapping_config(self._config_full_path)
             self.log(f"Configuration loaded for form: {config['form_url']}")
+            # Rows the form would reject are reported without opening a browser for them.
+            preflight = Preflight(config, compile_form_plan(config))
 
-            filler = FormFiller(
-                config, 
-                randomize_delay=not self.disable_delay.get(), 
-                headless=self.headless_mode.get()
+            # Every finished row goes to the journal and the report as it finishes, so a cancelled run is covered too.
+            # The GUI keeps its own journal: main.py's is left alone for a later --resume.
+            journal_file = Path("reports") / f"journal_gui_{Path(self._data_full_path).stem}_{Path(self._config_full_path).stem}.jsonl"
+            journal = Journal(journal_file)
+            report = ReportWriter(
+                Path("reports") / f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                data_columns=list(config['field_mappings'])
             )
+
+            limiter = configure_shared_limiter(
+                parse_rate(self.rate.get()), jitter=0.0 if self.disable_delay.get() else 1.0
+            )
+            self.log(f"Pacing: {limiter.describe()}")
+            headless = self.headless_mode.get()
+            workers = max(1, self.workers.get())
+            fill_mode = 'bulk' if self.bulk_fill.get() else 'element'
+            # Worker progress ("[worker N] ...") goes straight to the log as well.
+            self.pool = FillerPool(
+                lambda: FormFiller(config, headless=headless, fill_mode=fill_mode),
+                workers=workers,
+                log=self.log,
+                rate_limiter=limiter
+            )
+            self.progress = {
+                'total': data_rows.count_rows(), 'started': time.monotonic(), 'done': 0, 'counts': {},
+                'pacing': f"Pacing: {limiter.describe()}", 'finished': False,
+            }
             
-            total = len(data_rows)
-            for i, row in enumerate(data_rows):
-                self.log(f"[{i+1}/{total}] Processing row for: {row.get('full_name', 'N/A')}")
-                result = filler.fill_form_for_row(row)
-                self.log(f"  -> Status: {result['status']} | Reason: {result['reason']}")
+            for i, result in self.pool.run(preflight.check(data_rows)):
+                if self.cancel_requested.is_set():
+                    # Catches a cancel pressed before the pool had started.
+                    self.pool.stop()
+                self.log(f"[{i+1}] {result['data'].get('full_name', 'N/A')} (worker {result.get('worker', '?')}, {data_rows.progress()})")
+                self.log(f"  -> Status: {result['status']} | Reason: {result['reason']} | {result.get('latency', 0):.2f}s")
+                report.write(journal.record(result))
+                counts = self.progress['counts']
+                counts[result['status']] = counts.get(result['status'], 0) + 1
+                self.progress['done'] += 1
+                self.progress['pacing'] = f"Pacing: {limiter.describe()}"
+
+            for line in preflight.summary_lines():
+                self.log(line)
 
         except Exception as e:
             self.log(f"FATAL ERROR: {e}")
             messagebox.showerror("Fatal Error", f"An unexpected error occurred:\n{e}")
         finally:
-            if filler:
-                filler.close()
+            if self.progress:
+                self.progress['finished'] = True
+            if journal:
+                journal.close()
+            if report:
+                try:
+                    report.close()
+                    for line in report.summary_lines():
+                        self.log(line)
+                    partial = "Partial report" if self.cancel_requested.is_set() else "Report"
+                    self.log(f"{partial} saved to: {report.path} (summary: {report.summary_path})")
+                except OSError as e:
+                    self.log(f"ERROR: {e}")
+            self.pool = None
             self.log("--- Automation Finished ---")
             # Re-enable the button from the main thread
             self.after(0, lambda: self.run_button.config(state="normal"))
+            self.after(0, lambda: self.cancel_button.config(state="disabled"))
 
 if __name__ == "__main__":
     app = App()
@@ -2,13 +2,21 @@
 # Replace the entire contents of your file with this code.
 
 import argparse
-import csv
 from datetime import datetime
 from pathlib import Path
 
-from form_filler.data_loader import load_data
+from form_filler.data_loader import iter_rows, parse_shard, DEFAULT_CHUNKSIZE, Preflight
 from form_filler.config_handler import load_mapping_config
-from form_filler.filler import FormFiller
+from form_filler.form_plan import RESOURCE_KINDS, compile_form_plan
+from form_filler.filler import FormFiller, FILL_MODES
+from form_filler.daemon import DEFAULT_DAEMON_ADDRESS, RemoteFormFiller, parse_address
+from form_filler.http_filler import HttpFormFiller, make_http_pool
+from form_filler.pool import FillerPool
+from form_filler.rate_limit import configure_shared_limiter, parse_rate
+from form_filler.metrics import RunMetrics
+from form_filler.journal import Journal, completed_hashes, row_hash
+from form_filler.reports import REPORT_FORMATS, ReportWriter, best_entries
+from form_filler.submission_index import DEFAULT_INDEX_FILE, SubmissionIndex
 
 def main():
     # This parser defines ALL the arguments the script accepts.
@@ -27,64 +35,249 @@ def main():
         "--report-dir", default="reports", help="Directory to save the submission report."
     )
     parser.add_argument(
-        "--no-delay", action="store_true", help="Disable random delays between actions."
+        "--report-format", choices=REPORT_FORMATS, default="csv",
+        help="Format of the submission report, written row by row as rows finish (parquet needs pyarrow)."
+    )
+    parser.add_argument(
+        "--no-delay", action="store_true", help="Disable the random delay (--jitter) added to each row."
+    )
+    parser.add_argument(
+        "--rate", type=parse_rate, default=None,
+        help="Maximum submissions across all workers, e.g. '2/s' or '120/min' (default: unlimited)."
+    )
+    parser.add_argument(
+        "--burst", type=int, default=1, help="Rows that may start back to back before --rate pacing applies."
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=1.0, help="Extra random delay of up to this many seconds per row."
     )
     parser.add_argument(
         "--headless", action="store_true", help="Run the browser in headless mode (no GUI)."
     )
+    parser.add_argument(
+        "--engine", choices=["browser", "http"], default="browser",
+        help="'browser' drives Chrome; 'http' submits plain HTML forms directly, without a browser."
+    )
+    parser.add_argument(
+        "--base-url", help="For --engine http: URL the form paths are served under, e.g. http://localhost:8000/"
+    )
+    parser.add_argument(
+        "--daemon", nargs="?", const=DEFAULT_DAEMON_ADDRESS, metavar="HOST:PORT",
+        help=f"Fill with the warm browsers of a running filler_daemon.py (default address {DEFAULT_DAEMON_ADDRESS})."
+    )
+    parser.add_argument(
+        "--fill-mode", choices=FILL_MODES, default="element",
+        help="'element' fills each field through WebDriver; 'bulk' fills the whole row with one injected script."
+    )
+    parser.add_argument(
+        "--reuse-page", action="store_true",
+        help="Reset the loaded form between rows instead of loading it again (forms that stay put or go to a success page). "
+             "Not possible when the success condition checks for a message the form shows in place."
+    )
+    parser.add_argument(
+        "--block-resources", nargs="*", choices=RESOURCE_KINDS, metavar="KIND",
+        help=f"Stop the browser loading these resources: {', '.join(RESOURCE_KINDS)} (default with no KIND: all)."
+    )
+    parser.add_argument(
+        "--recycle-after", type=int, default=None, help="Restart each browser after this many rows, to keep memory flat."
+    )
+    parser.add_argument(
+        "--max-browser-memory", type=float, default=None,
+        help="Restart a browser once it uses more than this many MB (needs psutil)."
+    )
+    parser.add_argument(
+        "--max-retries", type=int, default=2, help="Times a row is retried on a new browser after the browser crashed."
+    )
+    parser.add_argument(
+        "--retry-backoff", type=float, default=1.0, help="Seconds before the first retry; doubled for each further one."
+    )
+    parser.add_argument(
+        "--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+        help="Rows to read at a time from CSV files, and to validate at a time before filling."
+    )
+    parser.add_argument(
+        "--shard", type=parse_shard, metavar="I/N",
+        help="Only fill the rows of shard I of N, e.g. 2/4. Every row belongs to exactly one shard, on any machine."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Number of browsers to fill forms with in parallel."
+    )
+    parser.add_argument(
+        "--journal", help="Path of the checkpoint journal (default: one per data/config pair in the report directory)."
+    )
+    parser.add_argument(
+        "--resume", action="store_true", help="Continue an earlier run, skipping rows its journal records as SUCCESS."
+    )
+    parser.add_argument(
+        "--index-file", default=DEFAULT_INDEX_FILE, help="Database of rows already submitted in earlier runs."
+    )
+    parser.add_argument(
+        "--ignore-index", action="store_true", help="Submit every row, even ones the index says were already submitted."
+    )
+    parser.add_argument(
+        "--metrics-file", help="Keep run metrics in this file while running (.json, or .prom for Prometheus text)."
+    )
+    parser.add_argument(
+        "--metrics-interval", type=float, default=5.0, help="Seconds between metrics file updates."
+    )
     args = parser.parse_args()
+    if args.block_resources == []:
+        args.block_resources = list(RESOURCE_KINDS)
 
-    results = []
-    filler = None
+    report_path = Path(args.report_dir)
+    # Shards may share a report directory, so each keeps its own journal and reports.
+    shard_suffix = f"_shard{args.shard[0]}of{args.shard[1]}" if args.shard else ""
+    journal_file = Path(args.journal) if args.journal else (
+        report_path / f"journal_{Path(args.data_file).stem}_{Path(args.config_file).stem}{shard_suffix}.jsonl"
+    )
+
+    data_rows = None
+    journal = None
+    report = None
+    # With --resume: rows the earlier runs submitted, and rows this run got a result for.
+    done = set()
+    attempted = set()
+    index = None
+    limiter = None
+    preflight = None
+    processed = 0
+    metrics = RunMetrics(args.metrics_file, flush_interval=args.metrics_interval)
     try:
-        print("Loading data...")
-        data_rows = load_data(args.data_file)
-        print(f"Loaded {len(data_rows)} rows of data.")
+        print("Opening data file...")
+        # Rows are read lazily while the forms are being filled.
+        data_rows = iter_rows(args.data_file, chunksize=args.chunksize, shard=args.shard)
+        print(f"Streaming rows from: {args.data_file}")
+        if args.shard:
+            print(f"Shard {args.shard[0]}/{args.shard[1]}: rows of the other shards are skipped while reading.")
 
         print("Loading form configuration...")
         config = load_mapping_config(args.config_file)
         print(f"Configuration loaded for form: {config['form_url']}")
 
-        filler = FormFiller(
-            config,
-            randomize_delay=not args.no_delay,
-            headless=args.headless
+        rows = data_rows
+        if args.resume:
+            done = completed_hashes(journal_file)
+            print(f"Resuming from {journal_file}: {len(done)} already submitted rows will be skipped.")
+            rows = (row for row in data_rows if row_hash(row) not in done)
+
+        # Rows submitted in any earlier run are dropped here, before they reach a browser.
+        index = SubmissionIndex(args.index_file)
+        if not args.ignore_index:
+            rows = index.filter_new(config['form_url'], rows, config['field_mappings'])
+
+        # Every row is checked against the form up front; invalid ones go straight to the report.
+        preflight = Preflight(config, compile_form_plan(config), chunksize=args.chunksize)
+        rows = preflight.check(rows)
+
+        limiter = configure_shared_limiter(
+            args.rate, burst=args.burst, jitter=0.0 if args.no_delay else args.jitter
+        )
+        print(f"Pacing: {limiter.describe()}")
+
+        if args.engine == "http":
+            if not args.base_url:
+                raise ValueError("--engine http needs --base-url, e.g. http://localhost:8000/")
+            if args.daemon:
+                raise ValueError("--daemon drives browsers, so it cannot be combined with --engine http.")
+            # All workers share one connection pool.
+            http = make_http_pool(args.workers)
+            make_filler = lambda: HttpFormFiller(config, args.base_url, http=http)
+        elif args.daemon:
+            # Every worker leases one of the daemon's browsers instead of starting Chrome itself.
+            daemon_address = parse_address(args.daemon)
+            make_filler = lambda: RemoteFormFiller(
+                config, daemon_address, fill_mode=args.fill_mode,
+                page_reuse=args.reuse_page, block_resources=args.block_resources,
+                recycle_after=args.recycle_after, max_memory_mb=args.max_browser_memory,
+                max_retries=args.max_retries, retry_backoff=args.retry_backoff
+            )
+        else:
+            # Every worker gets its own FormFiller, and therefore its own browser.
+            make_filler = lambda: FormFiller(
+                config,
+                headless=args.headless,
+                fill_mode=args.fill_mode,
+                recycle_after=args.recycle_after,
+                max_memory_mb=args.max_browser_memory,
+                max_retries=args.max_retries,
+                retry_backoff=args.retry_backoff,
+                page_reuse=args.reuse_page,
+                block_resources=args.block_resources
+            )
+        pool = FillerPool(
+            make_filler,
+            workers=args.workers,
+            rate_limiter=limiter
         )
         
-        total = len(data_rows)
-        print("\n--- Starting Form Submission ---")
+        report = ReportWriter(
+            report_path / f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}{shard_suffix}.{args.report_format}",
+            args.report_format, data_columns=list(config['field_mappings'])
+        )
+        if args.resume:
+            # The report has one row per data row of the whole job. Rows submitted earlier are
+            # skipped below, so their successes come from the journal.
+            for entry in best_entries([journal_file], keep=done.__contains__):
+                report.write(entry)
+        journal = Journal(journal_file, resume=args.resume)
 
-        for i, row in enumerate(data_rows):
-            print(f"[{i+1}/{total}] Processing row for: {row.get('full_name', 'N/A')}")
-            result = filler.fill_form_for_row(row)
-            print(f"  -> Status: {result['status']} | Reason: {result['reason']}")
-            results.append(result)
+        print(f"\n--- Starting Form Submission ({args.workers} worker(s)) ---")
 
-    except (FileNotFoundError, ValueError) as e:
+        for i, result in pool.run(rows):
+            print(f"[{i+1}] {result['data'].get('full_name', 'N/A')} ({data_rows.progress()}, {limiter.achieved_rate():.2f} rows/s)")
+            print(f"  -> Status: {result['status']} | Reason: {result['reason']} | {result.get('latency', 0):.2f}s")
+            # Each row is on disk before the next one is reported, so nothing is kept in memory.
+            # The report is written on a background thread from the journal entry.
+            entry = journal.record(result)
+            report.write(entry)
+            if args.resume:
+                attempted.add(entry['row_hash'])
+            metrics.observe(result)
+            if result['status'] == 'SUCCESS':
+                index.record(config['form_url'], result['data'], config['field_mappings'])
+            processed += 1
+
+    except (FileNotFoundError, ValueError, ConnectionError) as e:
         print(f"Error: {e}")
-        return
+    except KeyboardInterrupt:
+        print("\nInterrupted. Progress is saved; rerun with --resume to continue.")
     finally:
-        if filler:
-            filler.close()
+        if journal:
+            journal.close()
+        if report:
+            try:
+                if args.resume:
+                    # Rows that failed earlier and were not reached this time keep their last attempt.
+                    for entry in best_entries([journal_file], keep=lambda h: h not in done and h not in attempted):
+                        report.write(entry)
+                report.close()
+                print()
+                for line in report.summary_lines():
+                    print(line)
+                print(f"Submission report saved to: {report.path} (summary: {report.summary_path})")
+                print(f"Checkpoint journal: {journal_file}")
+            except OSError as e:
+                print(f"Error: {e} Every row is still in the journal {journal_file}.")
+        if data_rows and data_rows.rows_in_other_shards:
+            print(f"\nLeft {data_rows.rows_in_other_shards} rows to the other shards.")
+        if index:
+            if index.skipped:
+                print(f"\nSkipped {index.skipped} rows already submitted in earlier runs.")
+            index.close()
+        if preflight and preflight.rows_checked:
+            print()
+            for line in preflight.summary_lines():
+                print(line)
+        if limiter:
+            print(f"Pacing: {limiter.describe()}")
+        if processed:
+            print("\nTimings per phase:")
+            for line in metrics.summary_lines():
+                print(f"  {line}")
+            metrics.flush()
+            if args.metrics_file:
+                print(f"Metrics saved to: {args.metrics_file}")
         print("\n--- Automation Finished ---")
 
-    if results:
-        report_path = Path(args.report_dir)
-        report_path.mkdir(exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_file = report_path / f"report_{timestamp}.csv"
-
-        with open(report_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(['Timestamp', 'Status', 'Reason', 'Data'])
-            for res in results:
-                writer.writerow([
-                    datetime.now().isoformat(),
-                    res['status'],
-                    res['reason'],
-                    str(res['data'])
-                ])
-        print(f"\nSubmission report saved to: {report_file}")
-
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,46 @@
+import argparse
+
+from form_filler.submission_index import DEFAULT_INDEX_FILE, SubmissionIndex
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and maintain the index of already submitted rows.")
+    parser.add_argument("--index-file", default=DEFAULT_INDEX_FILE, help="Path to the submission index database.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_cmd = commands.add_parser("list", help="Show submitted row counts per form, or the entries of one form.")
+    list_cmd.add_argument("--form-url", help="Only list the entries recorded for this form.")
+
+    prune_cmd = commands.add_parser("prune", help="Forget submissions older than a number of days.")
+    prune_cmd.add_argument("--older-than-days", type=int, required=True, help="Age in days after which entries are removed.")
+    prune_cmd.add_argument("--form-url", help="Only prune entries recorded for this form.")
+
+    invalidate_cmd = commands.add_parser("invalidate", help="Forget every submission to a form so its rows are sent again.")
+    invalidate_cmd.add_argument("--form-url", required=True, help="The form whose entries should be removed.")
+    args = parser.parse_args()
+
+    index = SubmissionIndex(args.index_file)
+    try:
+        if args.command == "list":
+            if args.form_url:
+                count = 0
+                for row_hash, submitted_at in index.list_entries(args.form_url):
+                    print(f"{submitted_at}  {row_hash}")
+                    count += 1
+                print(f"\n{count} submitted rows for {args.form_url}")
+            else:
+                forms = index.list_forms()
+                if not forms:
+                    print("The submission index is empty.")
+                for form_url, count, last_submitted in forms:
+                    print(f"{form_url}: {count} submitted rows (last: {last_submitted})")
+        elif args.command == "prune":
+            removed = index.prune(args.older_than_days, args.form_url)
+            print(f"Removed {removed} entries older than {args.older_than_days} days.")
+        elif args.command == "invalidate":
+            removed = index.invalidate(args.form_url)
+            print(f"Removed {removed} entries for {args.form_url}.")
+    finally:
+        index.close()
+
+if __name__ == "__main__":
+    main()
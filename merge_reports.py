@@ -0,0 +1,34 @@
+import argparse
+import glob
+
+from form_filler.reports import REPORT_FORMATS, merge_reports
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge the journals and reports of several shards or runs into one deduplicated report.")
+    parser.add_argument("inputs", nargs="+", help="Journals (.jsonl) and reports (.csv, .jsonl, .parquet) to merge. Wildcards are allowed.")
+    parser.add_argument("--output", required=True, help="Path of the merged report; its extension sets the format unless --format is given.")
+    parser.add_argument("--format", choices=REPORT_FORMATS, help="Format of the merged report.")
+    parser.add_argument("--journal-output", help="Also write the merged rows as a journal, e.g. to --resume the whole job from it.")
+    args = parser.parse_args()
+
+    inputs = []
+    for pattern in args.inputs:
+        # Windows shells pass wildcards through unexpanded. Report summaries are not rows.
+        matches = [path for path in sorted(glob.glob(pattern)) if not path.endswith('_summary.json')]
+        inputs.extend(matches or [pattern])
+
+    try:
+        read, report = merge_reports(inputs, args.output, args.format, args.journal_output)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return
+
+    print(f"Merged {read} entries from {len(inputs)} files into {report.rows} rows ({read - report.rows} duplicates dropped).")
+    for line in report.summary_lines():
+        print(line)
+    print(f"Merged report saved to: {report.path} (summary: {report.summary_path})")
+    if args.journal_output:
+        print(f"Merged journal saved to: {args.journal_output}")
+
+if __name__ == "__main__":
+    main()
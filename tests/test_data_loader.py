@@ -0,0 +1,162 @@
+import argparse
+import csv
+
+import pytest
+from openpyxl import Workbook
+
+from form_filler.data_loader import NA_VALUES, PLACEHOLDER, Preflight, iter_rows, parse_shard, row_shard
+from form_filler.pool import FillerPool
+from form_filler.rate_limit import RateLimiter
+
+HEADER = ['full_name', 'email', None, 'email', 'diet']
+ROWS = [
+    ['Alice Johnson', 'None', 'x', 'alice@example.com', 'NA'],
+    ['Bob Smith', 'bob@example.com', 'y', 'N/A', 'Vegan'],
+]
+
+
+def write_csv(path):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['' if cell is None else cell for cell in HEADER])
+        writer.writerows(ROWS)
+
+
+def write_xlsx(path):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(HEADER)
+    for row in ROWS:
+        sheet.append(row)
+    workbook.save(path)
+
+
+def test_xlsx_rows_match_csv_rows(tmp_path):
+    write_csv(tmp_path / 'attendees.csv')
+    write_xlsx(tmp_path / 'attendees.xlsx')
+
+    from_csv = list(iter_rows(str(tmp_path / 'attendees.csv')))
+    from_xlsx = list(iter_rows(str(tmp_path / 'attendees.xlsx')))
+
+    assert from_xlsx == from_csv
+    assert from_xlsx[0] == {
+        'full_name': 'Alice Johnson', 'email': None, 'Unnamed: 2': 'x', 'email.1': 'alice@example.com', 'diet': None,
+    }
+
+
+def test_na_values_are_the_ones_pandas_reads_as_missing(tmp_path):
+    path = tmp_path / 'values.csv'
+    values = sorted(NA_VALUES - {''})
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows([['value']] + [[value] for value in values] + [['Nan'], ['none']])
+    rows = list(iter_rows(str(path)))
+    assert [row['value'] for row in rows[:len(values)]] == [None] * len(values)
+    assert [row['value'] for row in rows[len(values):]] == ['Nan', 'none']
+
+
+def field(name, kind, options=None, required=False):
+    return {'name': name, 'kind': kind, 'options': options, 'required': required, 'value': None}
+
+
+FIELDS = {
+    'full_name': field('participant_name', 'text'),
+    'email': field('contact_email', 'email'),
+    'age': field('user_age', 'number'),
+    'experience': field('skill_level', 'radio', ['Beginner', 'Intermediate', 'Advanced']),
+    'diet': field('diet_req', 'select', ['None', 'Vegetarian', 'Vegan']),
+}
+
+
+def preflight(fields=FIELDS):
+    config = {'field_mappings': {data_key: field['name'] for data_key, field in fields.items()}}
+    return Preflight(config, {'fields': fields}, chunksize=2)
+
+
+def test_options_are_filled_as_the_form_spells_them():
+    row = {'full_name': 'Alice', 'email': 'alice@example.com', 'age': 28.0, 'experience': ' intermediate', 'diet': 'VEGAN'}
+    [checked] = preflight().check([row])
+    assert checked.reason is None
+    assert checked == row
+    assert checked.fill_values == {
+        'full_name': ('participant_name', 'Alice'), 'email': ('contact_email', 'alice@example.com'),
+        'age': ('user_age', '28'), 'experience': ('skill_level', 'Intermediate'), 'diet': ('diet_req', 'Vegan'),
+    }
+
+
+def test_bad_numbers_emails_and_options_make_a_row_invalid():
+    rows = [
+        {'full_name': 'Alice', 'email': 'alice.example.com', 'age': 'twenty', 'experience': 'Expert', 'diet': 'Vegan'},
+        {'full_name': 'Bob', 'email': 'bob@example.com', 'age': '35', 'experience': 'Advanced', 'diet': 'None'},
+    ]
+    checker = preflight()
+    first, second = checker.check(rows)
+    assert "'alice.example.com' for 'contact_email' is not an email address" in first.reason
+    assert "'twenty' for 'user_age' is not a number" in first.reason
+    assert "'Expert' is not one of the options for 'skill_level'" in first.reason
+    assert second.reason is None
+    assert (checker.rows_checked, checker.invalid) == (2, 1)
+
+
+def test_empty_required_fields_get_no_placeholder():
+    fields = {
+        'full_name': field('participant_name', 'text', required=True),
+        'age': field('user_age', 'number', required=True),
+        'experience': field('skill_level', 'radio', ['Beginner', 'Advanced'], required=True),
+        'diet': field('diet_req', 'select', ['None', 'Vegan'], required=True),
+    }
+    [checked] = preflight(fields).check([{'full_name': None, 'age': None, 'experience': '', 'diet': None}])
+    assert checked.fill_values == {'full_name': ('participant_name', PLACEHOLDER)}
+    for name in ['user_age', 'skill_level', 'diet_req']:
+        assert f"Required field '{name}' has no value" in checked.reason
+    assert "participant_name" not in checked.reason
+
+
+def test_pool_reports_invalid_rows_without_filling_them():
+    filled = []
+
+    class RecordingFiller:
+        def fill_form_for_row(self, row):
+            filled.append(row['full_name'])
+            return {'status': 'SUCCESS', 'reason': 'ok', 'data': row}
+
+        def close(self):
+            pass
+
+    rows = [
+        {'full_name': 'Alice', 'email': 'alice@example.com', 'age': '28', 'experience': 'Beginner', 'diet': 'Vegan'},
+        {'full_name': 'Bob', 'email': 'bob', 'age': '35', 'experience': 'Advanced', 'diet': 'None'},
+        {'full_name': 'Cara', 'email': 'cara@example.com', 'age': '41', 'experience': 'Advanced', 'diet': 'None'},
+    ]
+    pool = FillerPool(RecordingFiller, workers=2, log=lambda message: None, rate_limiter=RateLimiter())
+    results = dict(pool.run(preflight().check(rows)))
+
+    assert [results[index]['status'] for index in range(3)] == ['SUCCESS', 'INVALID', 'SUCCESS']
+    assert 'not an email address' in results[1]['reason']
+    assert sorted(filled) == ['Alice', 'Cara']
+
+
+def test_shards_partition_the_rows(tmp_path):
+    path = tmp_path / 'attendees.csv'
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['full_name', 'email', 'age', 'diet'])
+        for i in range(200):
+            writer.writerow([f"  Person   {i} ", f"p{i}@example.com", '' if i % 7 == 0 else 20 + i % 50, 'Vegan' if i % 3 else ''])
+    everything = list(iter_rows(str(path), chunksize=32))
+
+    shards = {}
+    for number in (1, 2, 3):
+        stream = iter_rows(str(path), chunksize=32, shard=(number, 3))
+        shards[number] = list(stream)
+        assert stream.rows_read + stream.rows_in_other_shards == len(everything)
+        # The CSV path picks whole chunks at once; it has to agree with the per-row rule.
+        assert all(row_shard(row, 3) == number for row in shards[number])
+
+    assert all(shards.values())
+    assert sorted(row['email'] for rows in shards.values() for row in rows) == sorted(row['email'] for row in everything)
+
+
+@pytest.mark.parametrize('text', ['2', '0/3', '4/3', 'a/b', '1/0'])
+def test_bad_shards_are_argument_errors(text):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_shard(text)
@@ -0,0 +1,44 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from form_filler import field_matching
+from form_filler.field_matching import match_headers, optimal_assignment
+
+
+def brute_force_best(scores):
+    rows, cols = scores.shape
+    if rows <= cols:
+        return max(sum(scores[row, col] for row, col in enumerate(pick)) for pick in itertools.permutations(range(cols), rows))
+    return max(sum(scores[row, col] for col, row in enumerate(pick)) for pick in itertools.permutations(range(rows), cols))
+
+
+@pytest.mark.parametrize('shape', [(1, 1), (3, 3), (4, 6), (6, 4), (5, 5), (2, 7)])
+def test_assignment_matches_brute_force(monkeypatch, shape):
+    # Exercise the built-in solver even where SciPy is installed.
+    monkeypatch.setattr(field_matching, 'linear_sum_assignment', None)
+    rng = np.random.default_rng(sum(shape))
+    for _ in range(20):
+        # Few distinct values, so ties and zeros come up often.
+        scores = rng.integers(0, 5, size=shape).astype(float) * 25
+        pairs = optimal_assignment(scores)
+        rows, cols = zip(*pairs)
+        assert len(pairs) == min(shape)
+        assert len(set(rows)) == len(rows) and len(set(cols)) == len(cols)
+        assert sum(scores[row, col] for row, col in pairs) == brute_force_best(scores)
+
+
+def test_two_headers_never_take_the_same_field():
+    fields = {
+        'contact_email': [('label', 'Email'), ('name', 'contact_email')],
+        'participant_name': [('label', 'Full name'), ('name', 'participant_name')],
+    }
+    report = match_headers(['email', 'e-mail', 'full_name'], fields, threshold=60)
+
+    assert report['full_name']['field'] == 'participant_name'
+    claimed = [entry['field'] for entry in report.values() if entry['field']]
+    assert sorted(claimed) == ['contact_email', 'participant_name']
+    loser = next(entry for entry in report.values() if entry['field'] is None)
+    # It cleared the threshold, but the field was already taken by a better match.
+    assert loser['best_guess'] == 'contact_email' and loser['score'] >= 60
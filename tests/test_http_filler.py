@@ -0,0 +1,50 @@
+import pytest
+
+from benchmarks.form_server import PROJECT_ROOT, start_server
+from form_filler.config_handler import load_mapping_config
+from form_filler.http_filler import HttpFormFiller
+
+ROW = {'full_name': 'Alice Johnson', 'email': 'alice@example.com', 'age': '28', 'experience': 'Intermediate', 'diet': 'Vegan'}
+
+
+@pytest.fixture
+def config(monkeypatch):
+    # The mapping's form_url is relative to the project root.
+    monkeypatch.chdir(PROJECT_ROOT)
+    return load_mapping_config('config/form1_mapping.json')
+
+
+def fill(config, row, **server_options):
+    server, base_url = start_server(**server_options)
+    filler = HttpFormFiller(config, base_url)
+    try:
+        return filler.fill_form_for_row(row)
+    finally:
+        filler.close()
+        server.shutdown()
+        server.server_close()
+
+
+def test_submission_reaches_the_success_page(config):
+    result = fill(config, ROW)
+    assert result['status'] == 'SUCCESS', result['reason']
+    assert set(result['timings']) >= {'fill', 'submit', 'verify'}
+
+
+def test_url_condition_sees_the_full_url(config):
+    config['success_condition'] = {'type': 'url_matches', 'value': r'^http://127\.0\.0\.1:\d+/forms/success\.html\?'}
+    result = fill(config, ROW)
+    assert result['status'] == 'SUCCESS', result['reason']
+
+
+def test_server_error_is_a_failure(config):
+    result = fill(config, ROW, failure_rate=1.0)
+    assert result['status'] == 'FAILED'
+    assert 'HTTP 503' in result['reason']
+
+
+@pytest.mark.parametrize('field, value', [('experience', 'Expert'), ('diet', 'Paleo')])
+def test_value_that_is_not_an_option_is_a_failure(config, field, value):
+    result = fill(config, ROW | {field: value})
+    assert result['status'] == 'FAILED'
+    assert f"'{value}' is not one of the options" in result['reason']
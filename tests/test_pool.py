@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+
+from form_filler.pool import FillerPool
+from form_filler.rate_limit import RateLimiter
+
+
+class FakeFiller:
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.closed = False
+
+    def fill_form_for_row(self, row):
+        time.sleep(self.delay)
+        return {'status': 'SUCCESS', 'reason': 'ok', 'data': row}
+
+    def close(self):
+        self.closed = True
+
+
+def run_in_thread(target, timeout: float = 10.0):
+    """Runs target on a thread and fails the test if it does not finish in time."""
+    outcome = {}
+
+    def wrapper():
+        try:
+            outcome['value'] = target()
+        except Exception as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=wrapper, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "the pool hung"
+    return outcome
+
+
+def make_pool(fillers, workers=3):
+    return FillerPool(
+        lambda: fillers.append(FakeFiller()) or fillers[-1],
+        workers=workers, log=lambda message: None, rate_limiter=RateLimiter(),
+    )
+
+
+def test_run_fills_every_row_in_order():
+    fillers = []
+    pool = make_pool(fillers)
+    outcome = run_in_thread(lambda: list(pool.run({'n': i} for i in range(50))))
+    assert [index for index, _ in outcome['value']] == list(range(50))
+    assert all(filler.closed for filler in fillers)
+
+
+def test_stop_ends_the_run():
+    fillers = []
+    pool = make_pool(fillers)
+
+    def consume():
+        seen = []
+        for index, result in pool.run({'n': i} for i in range(10000)):
+            seen.append(index)
+            if len(seen) == 3:
+                pool.stop()
+        return seen
+
+    outcome = run_in_thread(consume)
+    assert len(outcome['value']) < 10000
+    assert all(filler.closed for filler in fillers)
+
+
+def test_feeder_error_is_raised():
+    fillers = []
+    pool = make_pool(fillers)
+
+    def rows():
+        yield {'n': 0}
+        raise ValueError("malformed line 2")
+
+    outcome = run_in_thread(lambda: list(pool.run(rows())))
+    with pytest.raises(ValueError, match="malformed line 2"):
+        raise outcome['error']
+    assert all(filler.closed for filler in fillers)
+
+
+def test_fillers_are_closed_when_the_caller_stops_early():
+    fillers = []
+    pool = make_pool(fillers)
+
+    def consume():
+        run = pool.run({'n': i} for i in range(10000))
+        for index, _ in run:
+            if index == 3:
+                break
+        run.close()
+
+    run_in_thread(consume)
+    assert fillers and all(filler.closed for filler in fillers)
@@ -0,0 +1,64 @@
+import csv
+import json
+
+from form_filler.reports import ReportWriter, best_entries, merge_reports
+
+
+def entry(index, data, status='SUCCESS'):
+    return {
+        'row_hash': f"hash{index}", 'timestamp': f"2026-01-01T00:00:{index:02d}", 'status': status,
+        'reason': 'ok', 'latency': 0.1, 'timings': {}, 'data': data,
+    }
+
+
+def write(path, entries, **kwargs):
+    report = ReportWriter(str(path), **kwargs)
+    for item in entries:
+        report.write(item)
+    report.close()
+    return report
+
+
+def test_data_columns_come_first_and_later_fields_are_reported(tmp_path):
+    entries = [entry(0, {'email': 'a@x.com'}), entry(1, {'email': 'b@x.com', 'phone': '123'})]
+    report = write(tmp_path / 'report.csv', entries, data_columns=['full_name', 'email'])
+
+    with open(tmp_path / 'report.csv', newline='', encoding='utf-8') as f:
+        header = next(csv.reader(f))
+    assert [column for column in header if column.startswith('data.')] == ['data.full_name', 'data.email']
+    assert report.left_out == {'data.phone': 1}
+    assert any('data.phone' in line for line in report.summary_lines())
+    with open(report.summary_path, encoding='utf-8') as f:
+        assert json.load(f)['columns_left_out'] == {'data.phone': 1}
+
+
+def test_jsonl_keeps_every_field(tmp_path):
+    entries = [entry(0, {'email': 'a@x.com'}), entry(1, {'email': 'b@x.com', 'phone': '123'})]
+    report = write(tmp_path / 'report.jsonl', entries)
+    assert not report.left_out
+
+
+def test_merge_keeps_fields_from_every_input(tmp_path):
+    journal = tmp_path / 'journal.jsonl'
+    with open(journal, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(entry(0, {'email': 'a@x.com'}, status='FAILED')) + '\n')
+        f.write(json.dumps(entry(1, {'email': 'b@x.com', 'phone': '123'})) + '\n')
+        f.write(json.dumps(entry(2, {'email': 'a@x.com'}) | {'row_hash': 'hash0'}) + '\n')
+
+    read, report = merge_reports([str(journal)], str(tmp_path / 'merged.csv'))
+    assert (read, report.rows) == (3, 2)
+    assert report.by_status == {'SUCCESS': 2}
+    assert not report.left_out
+
+
+def test_best_entries_gives_one_entry_per_row(tmp_path):
+    journal = tmp_path / 'journal.jsonl'
+    with open(journal, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(entry(0, {'email': 'a@x.com'}, status='FAILED')) + '\n')
+        f.write(json.dumps(entry(1, {'email': 'b@x.com'}, status='FAILED')) + '\n')
+        f.write(json.dumps(entry(2, {'email': 'b@x.com'}, status='FAILED') | {'row_hash': 'hash1'}) + '\n')
+        f.write(json.dumps(entry(3, {'email': 'a@x.com'}) | {'row_hash': 'hash0'}) + '\n')
+
+    winners = {item['row_hash']: item['timestamp'] for item in best_entries([str(journal)])}
+    assert winners == {'hash0': '2026-01-01T00:00:03', 'hash1': '2026-01-01T00:00:02'}
+    assert [item['row_hash'] for item in best_entries([str(journal)], keep={'hash1'}.__contains__)] == ['hash1']